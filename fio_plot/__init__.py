@@ -40,9 +40,15 @@ def main():
 
     settings = getdata.configure_default_settings(settings, routing_dict, graphtype)
 
+    # The stall report is written to stdout, so all other output goes to stderr
+    # to keep the report valid JSON.
+    if settings["stall_report"] == "-":
+        sys.stdout = sys.stderr
+
     data = routing_dict[graphtype]["get_data"](settings)
     #print(data)
-    routing_dict[graphtype]["function"](settings, data)
+    if not settings["no_render"]:
+        routing_dict[graphtype]["function"](settings, data)
     option_found = True
 
     checks.post_flight_check(parser, option_found)
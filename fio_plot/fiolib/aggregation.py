@@ -0,0 +1,115 @@
+import numpy as np
+
+from . import logparser
+from .logrecord import LogData
+
+#
+# Streaming aggregation folds log data into fixed size time buckets while it
+# is being read. Only the running aggregates per bucket are kept in memory,
+# not the individual samples. Supported functions are mean, max and min.
+#
+
+
+def new_aggregate_state(resolution):
+    return {"resolution": resolution, "directions": {}}
+
+
+def grow(array, size, fill):
+    if len(array) >= size:
+        return array
+    grown = np.full(max(size, len(array) * 2), fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+def get_buckets(state, rwt, size):
+    buckets = state["directions"].get(rwt)
+    if buckets is None:
+        buckets = {
+            "count": np.zeros(0, dtype=np.int64),
+            "sum": np.zeros(0, dtype=np.float64),
+            "max": np.zeros(0, dtype=np.float64),
+            "min": np.zeros(0, dtype=np.float64),
+        }
+        state["directions"][rwt] = buckets
+    buckets["count"] = grow(buckets["count"], size, 0)
+    buckets["sum"] = grow(buckets["sum"], size, 0)
+    buckets["max"] = grow(buckets["max"], size, -np.inf)
+    buckets["min"] = grow(buckets["min"], size, np.inf)
+    return buckets
+
+
+def fold_columns(state, timestamps, values, rwt):
+    """Adds the samples of one chunk (as separate columns) to the bucket aggregates."""
+    if len(timestamps) == 0:
+        return state
+    indexes = timestamps // state["resolution"]
+    values = values.astype(np.float64)
+    for direction in np.unique(rwt):
+        selection = rwt == direction
+        bucket_indexes = indexes[selection]
+        selected_values = values[selection]
+        size = int(bucket_indexes.max()) + 1
+        buckets = get_buckets(state, int(direction), size)
+        buckets["count"][:size] += np.bincount(bucket_indexes, minlength=size)
+        buckets["sum"][:size] += np.bincount(
+            bucket_indexes, weights=selected_values, minlength=size
+        )
+        np.maximum.at(buckets["max"], bucket_indexes, selected_values)
+        np.minimum.at(buckets["min"], bucket_indexes, selected_values)
+    return state
+
+
+def fold_chunk(state, chunk):
+    """Adds one 2D chunk as returned by the logparser to the bucket aggregates."""
+    return fold_columns(
+        state,
+        chunk[:, logparser.TIMESTAMP],
+        chunk[:, logparser.VALUE],
+        chunk[:, logparser.RWT],
+    )
+
+
+def fold_logdata(state, logdata):
+    return fold_columns(state, logdata.timestamp, logdata.value, logdata.rwt)
+
+
+def aggregate_chunks(chunks, resolution, function):
+    """Folds an iterable of parsed chunks into time buckets of resolution
+    msec and returns the result as LogData. Returns None if one of the chunks
+    could not be parsed."""
+    state = new_aggregate_state(resolution)
+    for chunk in chunks:
+        if chunk is None:
+            return None
+        fold_chunk(state, chunk)
+    return get_aggregate(state, function)
+
+
+def get_aggregate(state, function):
+    """Returns a LogData object with one sample per non-empty bucket and
+    direction. The timestamp of a bucket is the end of its interval, just like
+    fio records the end of the log_avg_msec interval."""
+    timestamps = []
+    values = []
+    directions = []
+    for direction, buckets in sorted(state["directions"].items()):
+        used = np.nonzero(buckets["count"])[0]
+        if function == "mean":
+            value = buckets["sum"][used] / buckets["count"][used]
+        else:
+            value = buckets[function][used]
+        timestamps.append((used + 1) * state["resolution"])
+        values.append(value)
+        directions.append(np.full(len(used), direction, dtype=np.int8))
+
+    if not timestamps:
+        return LogData.empty()
+
+    timestamps = np.concatenate(timestamps)
+    order = np.argsort(timestamps, kind="stable")
+    return LogData(
+        timestamps[order],
+        np.concatenate(values)[order],
+        np.concatenate(directions)[order],
+    )
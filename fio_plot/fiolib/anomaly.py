@@ -0,0 +1,242 @@
+import sys
+import json
+import numpy as np
+
+from . import dataimport
+
+#
+# Stall and outlier detection on the merged log data. A sample is an outlier
+# if it deviates more than k times the median absolute deviation (MAD) from
+# the median of its series: the median and MAD are not pulled along by the
+# spikes they are meant to find, unlike the mean and standard deviation. A
+# stall is a streak of samples without any throughput (iops or bw of zero)
+# that lasts at least stall_duration seconds. FIO doesn't log an interval
+# without I/O at all, so a gap of at least stall_duration seconds between two
+# samples is a stall as well. Stalls are also detected in the log of every
+# single job, before the jobs are merged: a stall of one job doesn't show up
+# as a stall in the sum of all jobs. Consecutive flagged samples are reported
+# as one interval.
+#
+
+#
+# Scales the MAD to the standard deviation of normally distributed data, so
+# the threshold k is comparable to a number of standard deviations.
+#
+MAD_SCALE = 1.4826
+
+
+def get_median_mad(values):
+    """Returns the median and the scaled median absolute deviation."""
+    if len(values) == 0:
+        return 0.0, 0.0
+    median = np.median(values)
+    mad = np.median(np.abs(values - median)) * MAD_SCALE
+    return float(median), float(mad)
+
+
+def get_outliers(values, median, mad, threshold):
+    """Returns a boolean array that is True for the values outside
+    median ± threshold * mad. A series without any spread has no outliers."""
+    if mad == 0:
+        return np.zeros(len(values), dtype=bool)
+    return np.abs(values - median) > threshold * mad
+
+
+def get_runs(mask):
+    """Returns the first and last index of every run of True values."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return starts, ends
+
+
+def get_mask(size, starts, ends):
+    """Returns a boolean array that is True within the given runs."""
+    edges = np.zeros(size + 1, dtype=np.int64)
+    np.add.at(edges, starts, 1)
+    np.add.at(edges, ends + 1, -1)
+    return np.cumsum(edges[:-1]) > 0
+
+
+def get_sample_interval(timestamps):
+    """Returns the median time (msec) between samples, used as the duration
+    of a single sample."""
+    if len(timestamps) < 2:
+        return 0
+    return float(np.median(np.diff(timestamps)))
+
+
+def get_stalls(timestamps, values, duration):
+    """Returns the first and last index of every streak of zero values that
+    lasts at least duration msec."""
+    starts, ends = get_runs(values <= 0)
+    interval = get_sample_interval(timestamps)
+    lengths = timestamps[ends] - timestamps[starts] + interval
+    keep = lengths >= duration
+    return starts[keep], ends[keep]
+
+
+def get_gaps(timestamps, duration):
+    """Returns the index of the last sample before every gap in the
+    timestamps that lasts at least duration msec. The gap is the time between
+    two samples minus the duration of the sample after the gap."""
+    gaps = np.diff(timestamps) - get_sample_interval(timestamps)
+    return np.flatnonzero(gaps >= duration)
+
+
+def make_gap_intervals(timestamps, indexes):
+    """Returns a list of dicts describing the gaps after the given samples,
+    like make_intervals. A gap has no samples: it starts one sample interval
+    after the sample before the gap and ends one sample interval before the
+    sample after the gap."""
+    interval = get_sample_interval(timestamps)
+    intervals = []
+    for index in indexes:
+        start = timestamps[index] + interval
+        intervals.append(
+            {
+                "kind": "stall",
+                "start": int(start),
+                "end": int(max(timestamps[index + 1] - interval, start)),
+                "first_index": int(index),
+                "last_index": int(index),
+                "samples": 0,
+                "peak": 0.0,
+            }
+        )
+    return intervals
+
+
+def get_stall_intervals(settings, datatype, timestamps, values):
+    """Returns the stalls of one series: the streaks of zero values (iops and
+    bw only) and the gaps in the timestamps."""
+    duration = settings["stall_duration"] * 1000
+    intervals = []
+    if datatype in ["iops", "bw"]:
+        starts, ends = get_stalls(timestamps, values, duration)
+        intervals.extend(make_intervals("stall", timestamps, values, starts, ends))
+    intervals.extend(make_gap_intervals(timestamps, get_gaps(timestamps, duration)))
+    return intervals
+
+
+def make_intervals(kind, timestamps, values, starts, ends):
+    """Returns a list of dicts describing the flagged intervals. The peak is
+    the value furthest away from normal: the maximum for high outliers, the
+    minimum for low outliers and stalls."""
+    intervals = []
+    for start, end in zip(starts, ends):
+        section = values[start:end + 1]
+        peak = section.max() if kind == "high" else section.min()
+        intervals.append(
+            {
+                "kind": kind,
+                "start": int(timestamps[start]),
+                "end": int(timestamps[end]),
+                "first_index": int(start),
+                "last_index": int(end),
+                "samples": int(end - start + 1),
+                "peak": float(peak),
+            }
+        )
+    return intervals
+
+
+def detect_series(settings, datatype, series):
+    """Detects the outliers and stalls of one series (LogData) and returns
+    the median, the MAD and the flagged intervals sorted by time."""
+    timestamps = series.timestamp
+    values = series.value.astype(np.float64)
+    median, mad = get_median_mad(values)
+    outliers = get_outliers(values, median, mad, settings["anomaly_threshold"])
+    intervals = get_stall_intervals(settings, datatype, timestamps, values)
+    for stall in intervals:
+        if stall["samples"] > 0:
+            outliers[stall["first_index"]:stall["last_index"] + 1] = False
+    for kind, selection in [("high", values > median), ("low", values < median)]:
+        starts, ends = get_runs(outliers & selection)
+        intervals.extend(make_intervals(kind, timestamps, values, starts, ends))
+    intervals.sort(key=lambda x: x["start"])
+    return {"median": median, "mad": mad, "intervals": intervals}
+
+
+def detect_job_stalls(settings, datatype, jobs, rw):
+    """Returns the stalls of every job (raw log data, before merging) that
+    has at least one stall."""
+    results = []
+    for job in jobs:
+        series = job["data"].direction(rw)
+        if len(series) == 0:
+            continue
+        intervals = get_stall_intervals(
+            settings, datatype, series.timestamp, series.value.astype(np.float64)
+        )
+        if intervals:
+            intervals.sort(key=lambda x: x["start"])
+            results.append({"job": job["job"], "filename": job["filename"], "intervals": intervals})
+    return results
+
+
+def detect_anomalies(settings, dataset, rawdata):
+    """Adds the detected outliers and stalls per data direction to every
+    record of the merged dataset (see dataimport.mergeDataSet), together with
+    the stalls of the individual jobs in rawdata (the jobs before merging)."""
+    index = dataimport.index_records(rawdata, ["directory", "iodepth", "numjobs", "type"])
+    for record in dataset:
+        key = (record["directory"], record["iodepth"], record["numjobs"], record["type"])
+        jobs = index.get(key, [])
+        record["anomalies"] = {}
+        for rw in settings["filter"]:
+            series = record["data"][rw]
+            if len(series) > 0:
+                result = detect_series(settings, record["type"], series)
+                result["jobs"] = detect_job_stalls(settings, record["type"], jobs, rw)
+                record["anomalies"][rw] = result
+    return dataset
+
+
+def get_report(settings, dataset):
+    """Returns the detected intervals of all records as a dict that can be
+    written as JSON."""
+    report = {
+        "anomaly_threshold": settings["anomaly_threshold"],
+        "stall_duration": settings["stall_duration"],
+        "series": [],
+    }
+    for record in dataset:
+        for rw, result in record["anomalies"].items():
+            entry = {
+                "directory": record["directory"],
+                "type": record["type"],
+                "iodepth": record["iodepth"],
+                "numjobs": record["numjobs"],
+                "rw": rw,
+                "median": result["median"],
+                "mad": result["mad"],
+                "stalls": sum(x["kind"] == "stall" for x in result["intervals"]),
+                "outliers": sum(x["kind"] != "stall" for x in result["intervals"]),
+                "job_stalls": sum(len(x["intervals"]) for x in result["jobs"]),
+                "intervals": result["intervals"],
+                "jobs": result["jobs"],
+            }
+            if "percentile" in record:
+                entry["percentile"] = record["percentile"]
+            report["series"].append(entry)
+    return report
+
+
+def write_report(settings, dataset):
+    """Writes the report to the stall_report file, or to stdout for '-'. In
+    that case all other output is sent to stderr (see fio_plot.main), so the
+    report is written to the original stdout."""
+    report = get_report(settings, dataset)
+    if settings["stall_report"] == "-":
+        json.dump(report, sys.__stdout__, indent=2)
+        sys.__stdout__.write("\n")
+        sys.__stdout__.flush()
+        return
+    try:
+        with open(settings["stall_report"], "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    except OSError as e:
+        print(f"\nThe stall report could not be written: {e}\n")
+        sys.exit(1)
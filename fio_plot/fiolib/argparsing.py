@@ -16,6 +16,12 @@ def set_arguments(settings):
             JSON files or log data (CSV) can be found.",
         required=True
     )
+    ag.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Also search the sub directories of the input directories for JSON and log files, \
+            for example the complete output tree of bench-fio.",
+    )
     ag.add_argument(
         "-o",
         "--output-filename",
@@ -70,6 +76,32 @@ def set_arguments(settings):
         help="This option generates a bar chart to compare results from different\
                                       benchmark runs.",
     )
+    exclusive_group.add_argument(
+        "--lba-heatmap",
+        action="store_true",
+        help="Generates a heatmap of time and device offset from per-I/O log data \
+            (fio log_offset=1, log_avg_msec=0). The color shows the number of I/Os (-t iops) \
+            or the mean latency or bandwidth (-t lat/clat/slat/bw) of each region.",
+    )
+    exclusive_group.add_argument(
+        "--latency-density",
+        action="store_true",
+        help="Generates a density raster of the latency of every I/O over time from per-I/O \
+            latency logs (fio log_avg_msec=0), with a logarithmic latency scale (-t lat/clat/slat).",
+    )
+    exclusive_group.add_argument(
+        "--tail-heatmap",
+        action="store_true",
+        help="Generates a heatmap of the share of I/O per latency bucket over time from the \
+            histogram logs of fio (write_hist_log, -t clat_hist).",
+    )
+    exclusive_group.add_argument(
+        "--fairness",
+        action="store_true",
+        help="Generates a graph of the fairness between the jobs of a benchmark (numjobs > 1) \
+            over time: Jain's fairness index and the range between the slowest and fastest job \
+            of a single type of log data (-t iops/bw/lat/clat/slat).",
+    )
 
     ag.add_argument(
         "--disable-grid",
@@ -83,6 +115,30 @@ def set_arguments(settings):
         help="\
             Enable markers for the plot lines when graphing log data.",
     )
+    ag.add_argument(
+        "--no-decimate",
+        action="store_true",
+        help="\
+            Plot every sample of the log data. By default, lines with more points than the \
+            graph is wide in pixels are reduced with the Largest-Triangle-Three-Buckets algorithm.",
+    )
+    ag.add_argument(
+        "--envelope",
+        action="store_true",
+        help="\
+            Draw the log data as an envelope: every pixel column of the graph is reduced to \
+            the minimum, maximum and mean. The band between minimum and maximum shows all spikes, \
+            the line is the mean.",
+    )
+    ag.add_argument(
+        "--anomalies",
+        action="store_true",
+        help="\
+            Mark stalls (red) and outliers (orange) on the log graph. Outliers are samples \
+            that deviate more than --anomaly-threshold times the median absolute deviation \
+            from the median, stalls are periods of zero iops or bandwidth or without any \
+            log entries.",
+    )
     ag.add_argument(
         "--subtitle",
         help="\
@@ -146,6 +202,14 @@ def set_arguments(settings):
         default=99.99,
         type=float,
     )
+    ag.add_argument(
+        "--percentile-accuracy",
+        help="Compute the statistics in the legend of log graphs with a quantile sketch with this "
+        "relative accuracy (for instance 0.01 for 1%%), instead of exactly from all samples. "
+        "Uses less memory for very large logs. Disabled by default.",
+        type=float,
+        default=settings["percentile_accuracy"],
+    )
     ag.add_argument(
         "-r",
         "--rw",
@@ -181,6 +245,141 @@ def set_arguments(settings):
                               (default is None to disable). Be carefull as this\
                                        setting may smooth out issues you may want to be aware of.",
     )
+    ag.add_argument(
+        "--smooth",
+        help="Smooth the log data with a filter over a window of --smooth-window samples or seconds: "
+        "simple moving average (sma), exponentially weighted moving average (ewma), rolling median "
+        "or rolling percentile (see --smooth-percentile). Replaces --moving-average.",
+        type=str,
+        choices=["sma", "ewma", "median", "percentile"],
+        default=settings["smooth"],
+    )
+    ag.add_argument(
+        "--smooth-window",
+        help="The size of the smoothing window (see --smooth-unit).",
+        type=float,
+        default=settings["smooth_window"],
+    )
+    ag.add_argument(
+        "--smooth-unit",
+        help="The unit of --smooth-window: samples or seconds. Default is samples.",
+        type=str,
+        choices=["samples", "seconds"],
+        default=settings["smooth_unit"],
+    )
+    ag.add_argument(
+        "--smooth-percentile",
+        help="The percentile used by the rolling percentile filter. Default is 95.",
+        type=float,
+        default=settings["smooth_percentile"],
+    )
+    ag.add_argument(
+        "--aggregate",
+        help="Stream the log data and aggregate it into time buckets of this many msec "
+        "(only used with -g). Memory usage depends on the number of buckets instead of the "
+        "number of samples, which is useful for very long or per-IO logs.",
+        type=int,
+        default=settings["aggregate"],
+    )
+    ag.add_argument(
+        "--aggregate-function",
+        help="The function used to aggregate the samples within a time bucket (see --aggregate). "
+        "Default is mean.",
+        type=str,
+        choices=["mean", "max", "min"],
+        default=settings["aggregate_function"],
+    )
+    ag.add_argument(
+        "--time-start",
+        help="Only graph the log data from this point in time (seconds) onwards (only used with -g). "
+        "Only the part of the log file within the time window is read.",
+        type=float,
+        default=settings["time_start"],
+    )
+    ag.add_argument(
+        "--time-end",
+        help="Only graph the log data up to this point in time (seconds) (only used with -g).",
+        type=float,
+        default=settings["time_end"],
+    )
+    ag.add_argument(
+        "--heatmap-bins",
+        help="The number of time bins and offset (or latency) bins of the --lba-heatmap, "
+        "--latency-density and --tail-heatmap graphs. Default is 200 100.",
+        nargs=2,
+        type=int,
+        default=settings["heatmap_bins"],
+    )
+    ag.add_argument(
+        "--trim-start",
+        help="Remove the ramp-up of every job: the first seconds (or samples, see --trim-unit) "
+        "of each log file are left out before merging and computing statistics (only used with -g).",
+        type=float,
+        default=settings["trim_start"],
+    )
+    ag.add_argument(
+        "--trim-end",
+        help="Remove the ramp-down of every job: the last seconds (or samples) of each log file "
+        "(only used with -g).",
+        type=float,
+        default=settings["trim_end"],
+    )
+    ag.add_argument(
+        "--trim-unit",
+        help="The unit of --trim-start and --trim-end: seconds or samples (per data direction). "
+        "Default is seconds.",
+        type=str,
+        choices=["seconds", "samples"],
+        default=settings["trim_unit"],
+    )
+    ag.add_argument(
+        "--anomaly-threshold",
+        help="The number of (scaled) median absolute deviations from the median beyond which "
+        "a sample is an outlier (used with --anomalies and --stall-report). Default is 5.",
+        type=float,
+        default=settings["anomaly_threshold"],
+    )
+    ag.add_argument(
+        "--stall-duration",
+        help="The minimum number of seconds without any iops or bandwidth, or without any "
+        "log entries, that counts as a stall. Default is 1.",
+        type=float,
+        default=settings["stall_duration"],
+    )
+    ag.add_argument(
+        "--stall-report",
+        help="Write the detected stalls and outliers of the log data, and the stalls of "
+        "the individual jobs, to this JSON file (use - for stdout). Only used with -g.",
+        type=str,
+        default=settings["stall_report"],
+    )
+    ag.add_argument(
+        "--no-render",
+        help="Don't draw the graph, for instance to only write the --stall-report.",
+        action="store_true",
+    )
+    ag.add_argument(
+        "--steadystate",
+        help="Detect steady state in the log data with a criterion like the ss option of fio: "
+        "iops:N, bw:N (all samples within N of the mean), iops_slope:N or bw_slope:N (slope of "
+        "the least squares line at most N per second). Add %% to use a percentage of the mean. "
+        "bw is in KiB/s like the logs. The steady state region is shaded on the -g graph.",
+        type=str,
+        default=settings["steadystate"],
+    )
+    ag.add_argument(
+        "--ss-dur",
+        help="The duration of the steady state window in seconds (like ss_dur). Default is 60.",
+        type=float,
+        default=settings["ss_dur"],
+    )
+    ag.add_argument(
+        "--ss-ramp",
+        help="Skip the first seconds of the log data for steady state detection (like ss_ramp). "
+        "Default is 0.",
+        type=float,
+        default=settings["ss_ramp"],
+    )
     ag.add_argument(
         "-x",
         "--min-y",
@@ -193,9 +392,18 @@ def set_arguments(settings):
         "--type",
         nargs="+",
         help="\
-            This setting specifies which kind of metric you want to graph.",
+            This setting specifies which kind of metric you want to graph. \
+            clat_hist reads the latency histogram logs of fio (write_hist_log) and graphs \
+            the percentiles selected with --hist-percentiles.",
         type=str,
-        choices=["bw", "iops", "lat", "slat", "clat"],
+        choices=["bw", "iops", "lat", "slat", "clat", "clat_hist"],
+    )
+    ag.add_argument(
+        "--hist-percentiles",
+        nargs="+",
+        help="The latency percentiles graphed from histogram logs (-t clat_hist). Default is 50 99 99.9.",
+        type=float,
+        default=settings["hist_percentiles"],
     )
     ag.add_argument(
         "-f",
@@ -269,6 +477,31 @@ def set_arguments(settings):
     ag.add_argument(
         "--max-bw", help="Maximum bandwidth on y-axis", type=int, default=None
     )
+    ag.add_argument(
+        "--workers",
+        help="Number of processes used to import log files in parallel (only used with -g). "
+        "Use 0 to use all CPU cores. Default is 1.",
+        type=int,
+        default=settings["workers"],
+    )
+    ag.add_argument(
+        "--no-cache",
+        help="Don't use the on-disk cache of parsed log files (only used with -g).",
+        action="store_true",
+    )
+    ag.add_argument(
+        "--cache-dir",
+        help="Directory used to cache parsed log files. Default is ~/.cache/fio-plot.",
+        type=str,
+        default=settings["cache_dir"],
+    )
+    ag.add_argument(
+        "--cache-size",
+        help="Maximum size of the log file cache in MB. The least recently used files "
+        "are removed first. Default is 1024.",
+        type=int,
+        default=settings["cache_size"],
+    )
     ag.add_argument(
         "--colors",
         help="Space separated list of colors (only used with -g). Color names can be found "
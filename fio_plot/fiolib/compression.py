@@ -0,0 +1,105 @@
+import io
+import bz2
+import gzip
+import lzma
+import zlib
+
+#
+# Log files may be compressed afterwards (gzip, xz, bzip2) or by fio itself
+# (log_store_compressed). Fio stores its compressed logs as a sequence of
+# independent zlib streams, using a .fz suffix.
+#
+READ_SIZE = 1024 * 1024
+
+
+class FioZlibReader(io.RawIOBase):
+    """File-like object that inflates fio's compressed log format: a number
+    of zlib streams, written one after the other."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.decompressor = zlib.decompressobj()
+        self.buffer = b""
+        self.exhausted = False
+
+    def readable(self):
+        return True
+
+    def fill_buffer(self):
+        data = b""
+        if self.decompressor.eof:
+            data = self.decompressor.unused_data
+            self.decompressor = zlib.decompressobj()
+        if not data:
+            data = self.fileobj.read(READ_SIZE)
+        if not data:
+            self.exhausted = True
+            self.buffer = self.decompressor.flush()
+            return
+        self.buffer = self.decompressor.decompress(data)
+
+    def readinto(self, b):
+        while not self.buffer and not self.exhausted:
+            self.fill_buffer()
+        size = min(len(b), len(self.buffer))
+        b[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+    def close(self):
+        self.fileobj.close()
+        super().close()
+
+
+def open_fio_zlib(filename):
+    return io.BufferedReader(FioZlibReader(open(filename, "rb")), READ_SIZE)
+
+
+def open_gzip(filename):
+    return gzip.open(filename, "rb")
+
+
+def open_xz(filename):
+    return lzma.open(filename, "rb")
+
+
+def open_bz2(filename):
+    return bz2.open(filename, "rb")
+
+
+COMPRESSION_TYPES = {
+    ".gz": open_gzip,
+    ".xz": open_xz,
+    ".bz2": open_bz2,
+    ".z": open_fio_zlib,
+    ".fz": open_fio_zlib,
+}
+
+
+def get_compression_suffix(filename):
+    """Returns the compression suffix of filename or None if the file is not compressed."""
+    for suffix in COMPRESSION_TYPES.keys():
+        if filename.endswith(suffix):
+            return suffix
+    return None
+
+
+def is_compressed(filename):
+    return get_compression_suffix(filename) is not None
+
+
+def is_log_file(filename):
+    """Returns True for fio log files, compressed or not (.log, .log.gz, ...)."""
+    suffix = get_compression_suffix(filename)
+    if suffix:
+        filename = filename[: -len(suffix)]
+    return filename.endswith(".log")
+
+
+def open_log_file(filename):
+    """Opens a (compressed) log file for reading in binary mode. The data is
+    decompressed while it is being read, never to disk."""
+    suffix = get_compression_suffix(filename)
+    if suffix:
+        return COMPRESSION_TYPES[suffix](filename)
+    return open(filename, "rb")
@@ -1,26 +1,29 @@
 import os
 import sys
+import io
 import csv
+import mmap
 
 # import pprint as pprint
 import re
-import statistics
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from . import supporting
+import numpy as np
+from . import supporting, logparser, logcache, logmerge, aggregation, compression, filescan, sketch, histlog
+from .logrecord import LogData, DIRECTIONS
 
 
-def list_fio_log_files(directory):
-    """Lists all .log files in a directory. Exits with an error if no files are found."""
+def list_fio_log_files(directory, recursive=False):
+    """Lists all .log files in a directory, including compressed log files
+    (see compression). If recursive is True, all sub directories are included.
+    Exits with an error if no files are found."""
     absolute_dir = os.path.abspath(directory)
-    files = os.listdir(absolute_dir)
-    fiologfiles = []
-    for f in files:
-        if f.endswith(".log"):
-            fiologfiles.append(os.path.join(absolute_dir, f))
+    fiologfiles = filescan.scan_directory(absolute_dir, recursive)["log"]
 
     if len(fiologfiles) == 0:
         print(
-            "\nCould not find any log files in the specified directory {str(absolute_dir)}"
+            f"\nCould not find any log files in the specified directory {str(absolute_dir)}"
         )
         print("\nAre the correct directories specified?")
         print("\nIf so, please check the -d -n and -r parameters.\n")
@@ -84,20 +87,82 @@ def return_filename_filter_string(settings):
     return searchstrings
 
 
+#
+# Log file names as generated by bench-fio (and fio itself):
+# <rw>-iodepth-<iodepth>-numjobs-<numjobs>_<type>.<job>.log[.<compression>]
+#
+LOG_FILENAME_PATTERN = re.compile(
+    r"^(?P<rw>\w+?)-iodepth-(?P<iodepth>\d+)-numjobs-(?P<numjobs>\d+)"
+    r"_(?P<type>[a-z_]+?)(?:\.(?P<job>\d+))?\.log(?:\.\w+)?$"
+)
+
+
+def parse_log_filename(filename):
+    """Returns the attributes (rw, iodepth, numjobs, type, job) encoded in the
+    name of a log file, or None if the name doesn't follow the convention."""
+    match = LOG_FILENAME_PATTERN.match(os.path.basename(filename))
+    if not match:
+        return None
+    return {
+        "rw": match["rw"],
+        "iodepth": int(match["iodepth"]),
+        "numjobs": int(match["numjobs"]),
+        "type": match["type"],
+        "job": int(match["job"] or 1),
+    }
+
+
+def index_records(records, keys):
+    """Returns a dict that maps a tuple of the values of keys to the list of
+    records with those values, so lookups don't require a scan."""
+    index = {}
+    for record in records:
+        index.setdefault(tuple(record[key] for key in keys), []).append(record)
+    return index
+
+
+def build_log_file_index(settings, file_list):
+    """Parses the name of every log file exactly once and returns an index
+    of the log files by (rw, iodepth, numjobs, type). The directory label is
+    determined once per directory. The log files are sorted by name within
+    each directory, the directories keep the order of file_list (the order of
+    the input directories), which determines the order of the legend."""
+    directories = {}
+    records = []
+    for item in file_list:
+        attributes = parse_log_filename(item)
+        if not attributes:
+            continue
+        parent = os.path.dirname(item)
+        if parent not in directories:
+            directories[parent] = return_folder_name(item, settings, True)
+        attributes["filename"] = item
+        attributes["directory"] = directories[parent]
+        records.append(attributes)
+    position = {parent: index for index, parent in enumerate(directories)}
+    records.sort(key=lambda x: (position[os.path.dirname(x["filename"])], x["filename"]))
+    return index_records(records, ["rw", "iodepth", "numjobs", "type"])
+
+
 def filterLogFiles(settings, file_list):
     """Returns a list of log files that matches the supplied filter string(s)."""
     searchstrings = return_filename_filter_string(settings)
+    index = build_log_file_index(settings, file_list)
     # pprint.pprint(searchstrings)
     result = []
-    for item in file_list:
-        for searchstring in searchstrings:
-            filename = os.path.basename(item)
-            # print(filename)
-            if re.search(r"^" + searchstring["searchstring"], filename):
-                data = {"filename": item}
-                data.update(searchstring)
-                data["directory"] = return_folder_name(item, settings, True)
-                result.append(data)
+    for searchstring in searchstrings:
+        key = (
+            searchstring["rw"],
+            int(searchstring["iodepth"]),
+            int(searchstring["numjobs"]),
+            searchstring["type"],
+        )
+        for record in index.get(key, []):
+            data = {"filename": record["filename"]}
+            data.update(searchstring)
+            data["job"] = record["job"]
+            data["directory"] = record["directory"]
+            result.append(data)
     # pprint.pprint(result)
     if len(result) > 0:
         return result
@@ -118,16 +183,15 @@ def getMergeOperation(datatype):
     We need to merge the data from all those job files into one result.
     Depending on the type of data, we must sum or average the data.
 
-    This function returns the appropriate function/operation based on the type.
+    This function returns the appropriate operation based on the type.
     """
 
     operationMapping = {
-        "iops": sum,
-        "lat": statistics.mean,
-        "clat": statistics.mean,
-        "slat": statistics.mean,
-        "bw": sum,
-        "timestamp": statistics.mean,
+        "iops": "sum",
+        "lat": "mean",
+        "clat": "mean",
+        "slat": "mean",
+        "bw": "sum",
     }
 
     opfunc = operationMapping[datatype]
@@ -137,30 +201,47 @@ def getMergeOperation(datatype):
 def mergeSingleDataSet(data, datatype):
     """In this function we merge all data for one particular set of files.
     For examle, iodepth = 1 and numjobs = 8. The function returns one single
-    dataset containing the summed/averaged data.
+    dataset per direction (LogData) containing the summed/averaged data.
+    The jobs are aligned on their timestamps, see logmerge.
     """
-    mergedSet = {"read": [], "write": []}
-    lookup = {"read": 0, "write": 1}
+    mergedSet = {"read": None, "write": None}
+    oper = getMergeOperation(datatype)
 
     for rw in ["read", "write"]:
-        for column in ["timestamp", "value"]:
-            unmergedSet = []
-            for record in data:
-                templist = []
-                for row in record["data"]:
-                    if int(row["rwt"]) == lookup[rw]:
-                        templist.append(int(row[column]))
-                unmergedSet.append(templist)
-            if column == "value":
-                oper = getMergeOperation(datatype)
-            else:
-                oper = getMergeOperation(column)
-            merged = [oper(x) for x in zip(*unmergedSet)]
-            mergedSet[rw].append(merged)
-        mergedSet[rw] = list(zip(*mergedSet[rw]))
+        series = [record["data"].direction(rw) for record in data]
+        mergedSet[rw] = logmerge.merge_jobs(series, oper)
     return mergedSet
 
 
+def get_sketches(settings, mergedSet):
+    """Summarizes the merged data per direction in a quantile sketch, which
+    is used for the statistics in the legend of the graph. The sketch is only
+    built with the percentile_accuracy setting, otherwise the statistics are
+    computed exactly (see supporting.get_statistics)."""
+    if settings["percentile_accuracy"] is None:
+        return {}
+    return {
+        rw: sketch.QuantileSketch.from_values(series.value, settings["percentile_accuracy"])
+        for rw, series in mergedSet.items()
+    }
+
+
+def mergeHistogramDataSet(settings, record, data):
+    """The histograms of all jobs are summed and every percentile selected by
+    the hist_percentiles setting becomes a latency series of its own. The
+    series are graphed like a clat log, labeled with their percentile."""
+    mergedSets = []
+    percentiles = settings["hist_percentiles"]
+    for percentile, newdata in zip(percentiles, histlog.merge_percentiles(data, percentiles)):
+        newrecord = dict(record)
+        newrecord["type"] = record["type"][: -len("_hist")]
+        newrecord["percentile"] = percentile
+        newrecord["data"] = newdata
+        newrecord["sketch"] = get_sketches(settings, newdata)
+        mergedSets.append(newrecord)
+    return mergedSets
+
+
 def get_unique_directories(dataset):
     directories = []
     for item in dataset:
@@ -180,6 +261,7 @@ def mergeDataSet(settings, dataset):
     mergedSets = []
     filterstrings = return_filename_filter_string(settings)
     directories = get_unique_directories(dataset)
+    index = index_records(dataset, ["directory", "iodepth", "numjobs", "type"])
 
     for directory in directories:
         for filterstring in filterstrings:
@@ -189,39 +271,75 @@ def mergeDataSet(settings, dataset):
                 "numjobs": filterstring["numjobs"],
                 "directory": directory,
             }
-            data = []
-            for item in dataset:
-                if (
-                    filterstring["searchstring"] in item["searchstring"]
-                    and item["directory"] == directory
-                ):
-                    data.append(item)
+            key = (
+                directory,
+                filterstring["iodepth"],
+                filterstring["numjobs"],
+                filterstring["type"],
+            )
+            data = index.get(key, [])
+            if filterstring["type"].endswith("_hist"):
+                mergedSets.extend(mergeHistogramDataSet(settings, record, data))
+                continue
             newdata = mergeSingleDataSet(data, filterstring["type"])
             record["data"] = newdata
+            record["sketch"] = get_sketches(settings, newdata)
             mergedSets.append(record)
     return mergedSets
 
 
+def get_mean_interval(dataset):
+    """Returns the mean distance (msec) between the records of the same data
+    direction, so interleaved read/write records don't halve the interval."""
+    distances = []
+    for rwt in np.unique(dataset.rwt):
+        distances.append(np.diff(dataset.timestamp[dataset.rwt == rwt]))
+    distances = np.concatenate(distances) if distances else np.empty(0)
+    if len(distances) == 0:
+        print("ERROR: mean requires at least one data point")
+        print("\n Could this be because of an empty log file?\n")
+        sys.exit(1)
+    return distances.mean()
+
+
+def expand_to_seconds(timestamps, values, mean):
+    """Expands records that span multiple seconds into one record per second.
+    A record covers the interval between the previous record (or one mean
+    interval, but not before the start of the job, for the first record) and
+    its own timestamp. It is repeated for
+    every whole second within that interval, so non-integer intervals don't
+    lose or duplicate seconds. Returns the index of the source record, the new
+    timestamps and the new values.
+    """
+    timestamps = timestamps.astype(np.float64)
+    first_start = max(timestamps[0] - mean, 0.0) if len(timestamps) else 0.0
+    start = np.concatenate(([first_start], timestamps[:-1]))
+    distance = timestamps - start
+    counts = (np.floor(timestamps / 1000) - np.floor(start / 1000)).astype(np.int64)
+    counts[distance <= 0] = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average_value = np.where(distance > 0, values / distance * mean, 0)
+
+    index = np.repeat(np.arange(len(timestamps)), counts)
+    offsets = np.cumsum(counts) - counts
+    within = np.arange(len(index)) - np.repeat(offsets, counts)
+    first_second = np.floor(start / 1000).astype(np.int64) + 1
+    new_timestamps = (np.repeat(first_second, counts) + within) * 1000
+    return index, new_timestamps, average_value[index]
+
+
 def parse_raw_cvs_data(settings, dataset):
     """This function exists mostly because I tried to test the performance
     of a 1.44MB floppy drive. The device is so slow that it can't keep up.
     This results in records that span multiple seconds, skewing the graphs.
     If this is detected, the data is averaged over the interval between records.
+
+    A time window or trim can leave fewer than two samples per direction, so
+    there is no interval to check. Those datasets are returned as is.
     """
-    new_set = []
-    distance_list = []
-    for index, item in enumerate(dataset):
-        if index == 0:
-            continue
-        else:
-            distance = int(item["timestamp"]) - int(dataset[index - 1]["timestamp"])
-            distance_list.append(distance)
-    try:
-        mean = int(statistics.mean(distance_list))
-    except statistics.StatisticsError as e:
-        print(f"ERROR: {e}")
-        print("\n Could this be because of an empty log file?\n")
-        sys.exit(1)
+    if len(dataset) == 0 or np.unique(dataset.rwt, return_counts=True)[1].max() < 2:
+        return dataset
+    mean = int(get_mean_interval(dataset))
 
     if mean > 1000:
         print(
@@ -236,50 +354,361 @@ def parse_raw_cvs_data(settings, dataset):
 
         # log data with a log_avg_msec higher than 1000 msec should be converted back
         # to values per 1000 msec
-        for index, item in enumerate(dataset):
-            if index == 0:
-                average_value = int(item["value"]) / int(item["timestamp"]) * 1000
-
-            else:
-                previous_timestamp = int(dataset[index - 1]["timestamp"])
-                distance = int(item["timestamp"]) - previous_timestamp
-                number_of_seconds = int(distance / 1000)
-                average_value = int(item["value"]) / distance * mean
-                for x in range(number_of_seconds):
-                    temp_dict = dict(item)
-                    temp_dict["value"] = average_value
-                    temp_dict["timestamp"] = previous_timestamp + x
-                    new_set.append(temp_dict)
-        return new_set
+        indexes = []
+        new_timestamps = []
+        new_values = []
+        for rwt in np.unique(dataset.rwt):
+            records = np.nonzero(dataset.rwt == rwt)[0]
+            index, timestamps, values = expand_to_seconds(
+                dataset.timestamp[records], dataset.value[records], mean
+            )
+            indexes.append(records[index])
+            new_timestamps.append(timestamps)
+            new_values.append(values)
+
+        new_timestamps = np.concatenate(new_timestamps)
+        order = np.argsort(new_timestamps, kind="stable")
+        result = dataset.select(np.concatenate(indexes)[order])
+        result.timestamp = new_timestamps[order]
+        result.value = np.concatenate(new_values)[order]
+        return result
     else:
         return dataset
 
 
-def readLogData(settings, inputfile):
-    """FIO log data is imported as CSV data. The scope is the import of a
-    single file.
+def readLogDataCsv(inputfile):
+    """FIO log data is imported as CSV data. This is the slow but tolerant
+    parser that is used if the vectorized parser can't handle a file.
+    Rows that don't contain numeric data are skipped.
     """
     dataset = []
-    if os.path.exists(inputfile):
-        with open(inputfile) as csv_file:
-            csv.register_dialect("CustomDialect", skipinitialspace=True, strict=True)
-            csv_reader = csv.DictReader(
-                csv_file,
-                dialect="CustomDialect",
-                delimiter=",",
-                fieldnames=["timestamp", "value", "rwt", "blocksize", "offset"],
+    with io.TextIOWrapper(compression.open_log_file(inputfile)) as csv_file:
+        csv.register_dialect("CustomDialect", skipinitialspace=True, strict=True)
+        csv_reader = csv.DictReader(
+            csv_file,
+            dialect="CustomDialect",
+            delimiter=",",
+            fieldnames=logparser.LOG_COLUMNS,
+        )
+        for item in csv_reader:
+            try:
+                row = [int(float(item[x] or 0)) for x in logparser.LOG_COLUMNS]
+            except (TypeError, ValueError):
+                continue
+            dataset.append(row)
+    if not dataset:
+        return logparser.empty_log_array()
+    return np.array(dataset, dtype=np.int64)
+
+
+def get_directions(settings):
+    """Returns the data directions (rwt values as found in the log files)
+    that are selected with the filter setting. Only those are imported."""
+    return [DIRECTIONS[x] for x in settings["filter"] if x in DIRECTIONS]
+
+
+def get_time_window(settings):
+    """Returns the time window (start, end) in msec as selected with the
+    time_start and time_end settings (in seconds), or None if both are unset."""
+    start = settings["time_start"]
+    end = settings["time_end"]
+    if start is None and end is None:
+        return None
+    return (
+        None if start is None else int(start * 1000),
+        None if end is None else int(end * 1000),
+    )
+
+
+def get_trim(settings):
+    """Returns the amount (start, end) to trim from every log file as selected
+    with the trim_start and trim_end settings, or None if nothing is trimmed.
+    The unit is set by trim_unit: seconds or samples (per data direction)."""
+    start = settings["trim_start"] or 0
+    end = settings["trim_end"] or 0
+    if not start and not end:
+        return None
+    return start, end
+
+
+def intersect_windows(window, other):
+    if window is None:
+        return other
+    starts = [x for x in (window[0], other[0]) if x is not None]
+    ends = [x for x in (window[1], other[1]) if x is not None]
+    return (max(starts) if starts else None, min(ends) if ends else None)
+
+
+def get_file_window(settings, inputfile):
+    """Returns the time window to read from inputfile and the trim that is
+    still to be applied after parsing (see trim_logdata).
+
+    Time based trimming of a plain log file is turned into a time window, using
+    the first and last timestamp of the file, so trimmed samples are never read.
+    Compressed files can't seek and sample based trimming depends on the number
+    of samples per direction, so those are trimmed after parsing.
+    """
+    window = get_time_window(settings)
+    trim = get_trim(settings)
+    if (
+        trim is None
+        or settings["trim_unit"] != "seconds"
+        or compression.is_compressed(inputfile)
+        or os.path.getsize(inputfile) == 0
+    ):
+        return window, trim
+    with open(inputfile, "rb") as log_file:
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            time_range = logparser.get_time_range(mapped)
+    if time_range is None:
+        return window, trim
+    first, last = time_range
+    trimmed = (first + int(trim[0] * 1000), last - int(trim[1] * 1000))
+    return intersect_windows(window, trimmed), None
+
+
+def trim_logdata(settings, dataset, trim):
+    """Removes the ramp-up and ramp-down samples of a parsed log file. With
+    the seconds unit, the trim is relative to the first and last timestamp.
+    With the samples unit, the first and last samples of each direction are
+    removed."""
+    if trim is None or len(dataset) == 0:
+        return dataset
+    if settings["trim_unit"] == "seconds":
+        first = int(dataset.timestamp.min()) + int(trim[0] * 1000)
+        last = int(dataset.timestamp.max()) - int(trim[1] * 1000)
+        return dataset.select_time_window((first, last))
+    start, end = int(trim[0]), int(trim[1])
+    keep = np.zeros(len(dataset), dtype=bool)
+    for direction in np.unique(dataset.rwt):
+        selection = dataset.rwt == direction
+        rank = np.cumsum(selection)
+        keep |= selection & (rank > start) & (rank <= rank[-1] - end)
+    return dataset.select(keep)
+
+
+def select_chunk(chunk, directions, window):
+    chunk = logparser.select_directions(chunk, directions)
+    return logparser.select_time_window(chunk, window)
+
+
+def iterParsedChunks(inputfile, directions=None, window=None):
+    """Yields the parsed chunks of a log file with only the selected data
+    directions and samples within the time window. Reading stops at the end
+    of the time window. A chunk that can't be parsed is yielded as None."""
+    for chunk in logparser.iter_file_chunks(inputfile, window=window):
+        parsed = logparser.parse_log_buffer(chunk)
+        if logparser.past_time_window(parsed, window):
+            break
+        yield select_chunk(parsed, directions, window)
+
+
+def readLogDataMmap(inputfile, directions=None, window=None):
+    """The log file is memory-mapped and converted by the vectorized parser
+    piece by piece, straight into preallocated LogData columns. The file
+    contents are never copied into memory as a whole, which allows per-IO logs
+    (log_avg_msec=0) that are larger than the available memory to be imported.
+    Rows of other data directions than directions are dropped per piece.
+    With a time window, only the part of the file within the window is read.
+    Returns None if the file could not be parsed by the vectorized parser.
+    """
+    if os.path.getsize(inputfile) == 0:
+        return LogData.empty()
+    with open(inputfile, "rb") as log_file:
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start, end = 0, len(mapped)
+            if window:
+                start, end = logparser.find_window_offsets(mapped, window)
+            size = logparser.count_lines(mapped, start=start, end=end)
+            chunks = (
+                select_chunk(logparser.parse_log_buffer(chunk), directions, window)
+                for chunk in logparser.iter_buffer_chunks(mapped, start=start, end=end)
             )
-            for item in csv_reader:
-                dataset.append(item)
+            return LogData.from_chunks(chunks, size)
+
+
+def readLogDataCompressed(inputfile, directions=None, window=None):
+    """Compressed log files are decompressed while streaming through the
+    vectorized parser. Returns None if the file could not be parsed."""
+    chunks = []
+    for chunk in iterParsedChunks(inputfile, directions, window):
+        if chunk is None:
+            return None
+        chunks.append(chunk)
+    if not chunks:
+        return LogData.empty()
+    return LogData.from_array(np.concatenate(chunks))
+
+
+def parseLogFile(inputfile, directions=None, window=None):
+    """Parses a single (compressed) log file into LogData, with only the data
+    directions in directions (all if None) and the samples within the time
+    window (all if None). The vectorized parser is used, falling back to the
+    csv based parser for malformed files."""
+    if compression.is_compressed(inputfile):
+        dataset = readLogDataCompressed(inputfile, directions, window)
+    else:
+        dataset = readLogDataMmap(inputfile, directions, window)
+    if dataset is None:
+        parsed = readLogDataCsv(inputfile)
+        dataset = LogData.from_array(select_chunk(parsed, directions, window))
+    return dataset
+
+
+def scanParsedChunks(inputfile, directions=None):
+    """Streams a log file once and returns the number of samples per data
+    direction and the first and last timestamp, or None if the file could not
+    be parsed by the vectorized parser."""
+    counts = {}
+    first, last = None, None
+    for chunk in iterParsedChunks(inputfile, directions):
+        if chunk is None:
+            return None
+        if len(chunk) == 0:
+            continue
+        timestamps = chunk[:, logparser.TIMESTAMP]
+        first = int(timestamps.min()) if first is None else min(first, int(timestamps.min()))
+        last = int(timestamps.max()) if last is None else max(last, int(timestamps.max()))
+        rwt, number = np.unique(chunk[:, logparser.RWT], return_counts=True)
+        for direction, count in zip(rwt.tolist(), number.tolist()):
+            counts[direction] = counts.get(direction, 0) + count
+    return {"counts": counts, "first": first, "last": last}
+
+
+def iterTrimmedChunks(settings, inputfile, directions, window, trim):
+    """Yields the parsed chunks of a log file like iterParsedChunks, without
+    the samples removed by trim (see trim_logdata). The file is streamed
+    twice: first to find the first and last timestamp and the number of
+    samples per direction, then to select the samples. Only a single chunk
+    is kept in memory. A chunk that can't be parsed is yielded as None."""
+    summary = scanParsedChunks(inputfile, directions)
+    if summary is None:
+        yield None
+        return
+    if summary["first"] is None:
+        return
+    if settings["trim_unit"] == "seconds":
+        trimmed = (summary["first"] + int(trim[0] * 1000), summary["last"] - int(trim[1] * 1000))
+        yield from iterParsedChunks(inputfile, directions, intersect_windows(window, trimmed))
+        return
+    start, end = int(trim[0]), int(trim[1])
+    seen = {}
+    for chunk in iterParsedChunks(inputfile, directions):
+        if chunk is None:
+            yield None
+            return
+        keep = np.zeros(len(chunk), dtype=bool)
+        for direction in np.unique(chunk[:, logparser.RWT]).tolist():
+            selection = chunk[:, logparser.RWT] == direction
+            rank = np.cumsum(selection) + seen.get(direction, 0)
+            keep |= selection & (rank > start) & (rank <= summary["counts"][direction] - end)
+            seen[direction] = int(rank[-1])
+        yield logparser.select_time_window(chunk[keep], window)
+
+
+def readLogDataAggregated(settings, inputfile):
+    """Streams the log file through the vectorized parser and folds every
+    chunk into time buckets of settings["aggregate"] msec. Memory usage is
+    proportional to the number of buckets, not to the number of samples.
+    The cache is not used, because a cache entry holds every sample of the
+    file. Trimmed samples are left out while streaming (see iterTrimmedChunks).
+    """
+    resolution = settings["aggregate"]
+    function = settings["aggregate_function"]
+    directions = get_directions(settings)
+    window, trim = get_file_window(settings, inputfile)
+
+    if trim is None:
+        chunks = iterParsedChunks(inputfile, directions, window)
+    else:
+        chunks = iterTrimmedChunks(settings, inputfile, directions, window, trim)
+    dataset = aggregation.aggregate_chunks(chunks, resolution, function)
+
+    if dataset is None:
+        parsed = LogData.from_array(select_chunk(readLogDataCsv(inputfile), directions, None))
+        parsed = trim_logdata(settings, parsed, trim).select_time_window(window)
+        state = aggregation.new_aggregate_state(resolution)
+        aggregation.fold_logdata(state, parsed)
+        dataset = aggregation.get_aggregate(state, function)
+    return dataset
+
+
+def is_histogram_log(inputfile):
+    attributes = parse_log_filename(inputfile)
+    return attributes is not None and attributes["type"].endswith("_hist")
+
+
+def readLogData(settings, inputfile):
+    """FIO log data is imported into a LogData object holding one array per
+    column (see logparser.LOG_COLUMNS). The scope is the import of a single
+    file. Only the data directions selected by the filter setting and the
+    samples within the selected time window are kept, without the ramp-up and
+    ramp-down samples selected with the trim settings (see get_file_window).
+
+    Parsed files are cached on disk (see logcache), so unchanged files are not
+    parsed again. To keep cache entries complete, a file that is not cached yet
+    is parsed with all directions. Without the cache, or if only a time window
+    is read (trimming), the other directions are dropped while parsing. If
+    aggregation is enabled, only the per-bucket aggregates are returned.
+
+    Histogram logs (write_hist_log) are imported as HistData, see histlog.
+    They are trimmed and windowed like the other log files.
+    """
+    dataset = LogData.empty()
+    directions = get_directions(settings)
+    if is_histogram_log(inputfile):
+        dataset = histlog.read_hist_log(inputfile, directions)
+        dataset = trim_logdata(settings, dataset, get_trim(settings))
+        return dataset.select_time_window(get_time_window(settings))
+    if os.path.exists(inputfile) and settings["aggregate"]:
+        return readLogDataAggregated(settings, inputfile)
+    if os.path.exists(inputfile):
+        window, trim = get_file_window(settings, inputfile)
+        dataset = logcache.load(settings, inputfile, directions)
+        if dataset is not None:
+            dataset = trim_logdata(settings, dataset, trim)
+            dataset = dataset.select_time_window(window)
+        elif logcache.cache_enabled(settings) and not window and not trim:
+            dataset = parseLogFile(inputfile)
+            logcache.store(settings, inputfile, dataset)
+            dataset = dataset.select_directions(directions)
+        elif trim is not None:
+            dataset = parseLogFile(inputfile, directions)
+            dataset = trim_logdata(settings, dataset, trim)
+            dataset = dataset.select_time_window(window)
+        else:
+            dataset = parseLogFile(inputfile, directions, window)
     dataset = parse_raw_cvs_data(settings, dataset)
     return dataset
 
 
+def get_number_of_workers(settings):
+    """Returns the number of processes used to import log files. A value of
+    0 means: use all available CPU cores."""
+    workers = settings["workers"]
+    if workers is None:
+        return 1
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
 def readLogDataFromFiles(settings, inputfiles):
-    """Returns a list of imported datasets based on the input files."""
+    """Returns a list of imported datasets based on the input files.
+    If more than one worker is configured, the files are parsed concurrently
+    by a pool of processes. The order of the returned datasets always matches
+    the order of the input files.
+    """
+    filenames = [inputfile["filename"] for inputfile in inputfiles]
+    workers = min(get_number_of_workers(settings), len(filenames))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(readLogData, repeat(settings), filenames))
+    else:
+        results = [readLogData(settings, filename) for filename in filenames]
+
     data = []
-    for inputfile in inputfiles:
-        logdata = readLogData(settings, inputfile["filename"])
+    for inputfile, logdata in zip(inputfiles, results):
         logdict = {"data": logdata}
         logdict.update(inputfile)
         data.append(logdict)
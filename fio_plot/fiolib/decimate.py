@@ -0,0 +1,79 @@
+import numpy as np
+
+#
+# Long logs contain far more samples than there are pixels in the graph.
+# Lines are decimated with the Largest-Triangle-Three-Buckets algorithm
+# (Steinarsson, 2013) before they are plotted. It keeps the points that
+# contribute most to the visual shape of the line, including its peaks.
+# Alternatively, every pixel column is reduced to its min, max and mean
+# (the envelope), so no spike is hidden at all.
+#
+
+
+def get_threshold(settings, axis):
+    """Returns the number of points that is drawn for a line: the width of
+    the figure in pixels."""
+    return int(axis.figure.get_figwidth() * settings["dpi"])
+
+
+def lttb(xvalues, yvalues, threshold):
+    """Returns the x and y values decimated to threshold points with the
+    Largest-Triangle-Three-Buckets algorithm. The first and last point are
+    always kept. For every bucket in between, the point is kept that forms
+    the largest triangle with the previously kept point and the average of
+    the next bucket. Lines with threshold points or less are returned as is.
+    """
+    xvalues = np.asarray(xvalues, dtype=np.float64)
+    yvalues = np.asarray(yvalues, dtype=np.float64)
+    size = len(xvalues)
+    if threshold < 3 or size <= threshold:
+        return xvalues, yvalues
+
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_end = end, edges[bucket + 2]
+            next_x = xvalues[next_start:next_end].mean()
+            next_y = yvalues[next_start:next_end].mean()
+        else:
+            next_x, next_y = xvalues[-1], yvalues[-1]
+        x_a, y_a = xvalues[previous], yvalues[previous]
+        areas = np.abs(
+            (x_a - next_x) * (yvalues[start:end] - y_a)
+            - (x_a - xvalues[start:end]) * (next_y - y_a)
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return xvalues[selected], yvalues[selected]
+
+
+def decimate_line(settings, axis, xvalues, yvalues):
+    """Decimates a line to the width of the figure in pixels, unless
+    decimation is disabled with --no-decimate."""
+    if settings["no_decimate"]:
+        return xvalues, yvalues
+    return lttb(xvalues, yvalues, get_threshold(settings, axis))
+
+
+def envelope(xvalues, yvalues, columns):
+    """Reduces a line to the minimum, maximum and mean y value of each of
+    columns equally wide x intervals. Returns the x value of the first
+    sample in each interval and the three reductions. Empty intervals are
+    left out. The x values must be sorted."""
+    xvalues = np.asarray(xvalues, dtype=np.float64)
+    yvalues = np.asarray(yvalues, dtype=np.float64)
+    if len(xvalues) == 0:
+        return xvalues, yvalues, yvalues, yvalues
+    bounds = np.linspace(xvalues[0], xvalues[-1], columns + 1)[:-1]
+    starts = np.unique(np.searchsorted(xvalues, bounds, side="left"))
+    starts = starts[starts < len(xvalues)]
+    counts = np.diff(np.append(starts, len(xvalues)))
+    minimum = np.minimum.reduceat(yvalues, starts)
+    maximum = np.maximum.reduceat(yvalues, starts)
+    mean = np.add.reduceat(yvalues, starts) / counts
+    return xvalues[starts], minimum, maximum, mean
@@ -12,10 +12,39 @@ def get_default_settings():
     settings["table_fontsize"] = 10
     settings["tablecolumn_spacing"] = 0.01
     settings["colors"] = [None]
+    settings["recursive"] = False
+    settings["no_decimate"] = False
+    settings["envelope"] = False
+    settings["smooth"] = None
+    settings["smooth_window"] = None
+    settings["smooth_unit"] = "samples"
+    settings["smooth_percentile"] = 95
+    settings["percentile_accuracy"] = None
+    settings["heatmap_bins"] = [200, 100]
+    settings["hist_percentiles"] = [50, 99, 99.9]
+    settings["workers"] = 1
+    settings["no_cache"] = False
+    settings["cache_dir"] = None
+    settings["cache_size"] = 1024
+    settings["aggregate"] = None
+    settings["aggregate_function"] = "mean"
+    settings["time_start"] = None
+    settings["time_end"] = None
+    settings["trim_start"] = 0
+    settings["trim_end"] = 0
+    settings["trim_unit"] = "seconds"
+    settings["anomalies"] = False
+    settings["anomaly_threshold"] = 5.0
+    settings["stall_duration"] = 1.0
+    settings["stall_report"] = None
+    settings["no_render"] = False
+    settings["steadystate"] = None
+    settings["ss_dur"] = 60.0
+    settings["ss_ramp"] = 0.0
     return settings
 
 def get_graphtype(settings):
-    graphtypes = 'bargraph3d','bargraph2d_qd','bargraph2d_nj','histogram','loggraph','compare_graph'
+    graphtypes = 'bargraph3d','bargraph2d_qd','bargraph2d_nj','histogram','loggraph','compare_graph','lba_heatmap','latency_density','tail_heatmap','fairness'
     for x in graphtypes:
         if settings[x]:
             return x
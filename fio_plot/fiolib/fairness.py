@@ -0,0 +1,147 @@
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+
+from . import dataimport, decimate, logmerge, supporting
+
+#
+# Fairness between the jobs of one set of log files (iodepth, numjobs). The
+# jobs are not merged: every job is resampled onto a common time grid as a row
+# of a 2D array (see logmerge.align_jobs) and every interval (column) is
+# reduced across the jobs that were running at that moment. An interval in
+# which a running job did no I/O counts as 0 iops or bw for that job, so a
+# starved job pulls the index down:
+#
+# Jain's fairness index  (sum x)^2 / (n * sum x^2): 1 if all n jobs got the
+#                        same share, 1/n if a single job got everything.
+# minimum / maximum      the value of the slowest and fastest job.
+#
+
+
+def jain_index(matrix):
+    """Returns Jain's fairness index of every column of matrix, over the
+    values that are not NaN. Intervals in which none of the jobs did any I/O
+    count as fair."""
+    running = ~np.isnan(matrix)
+    values = np.where(running, matrix, 0.0)
+    count = running.sum(axis=0)
+    total = values.sum(axis=0)
+    squares = (values ** 2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(squares > 0, total ** 2 / (count * squares), 1.0)
+
+
+def get_fairness(series, operation):
+    """Aligns a list of per-job LogData series with the merge operation of
+    their data type and returns the time grid (msec), the number of running
+    jobs, Jain's index and the minimum, mean and maximum across the jobs for
+    every interval that has a running job."""
+    grid, matrix = logmerge.align_jobs(series, operation)
+    jobs = (~np.isnan(matrix)).sum(axis=0)
+    used = jobs > 0
+    matrix = matrix[:, used]
+    return {
+        "timestamps": grid[used],
+        "jobs": jobs[used],
+        "jain": jain_index(matrix),
+        "minimum": np.fmin.reduce(matrix, axis=0),
+        "mean": np.nanmean(matrix, axis=0),
+        "maximum": np.fmax.reduce(matrix, axis=0),
+    }
+
+
+def get_fairness_dataset(settings, dataset):
+    """Groups the raw (unmerged) log data like dataimport.mergeDataSet and
+    returns a record with the fairness per data direction for every set of
+    log files with more than one job."""
+    records = []
+    filterstrings = dataimport.return_filename_filter_string(settings)
+    index = dataimport.index_records(dataset, ["directory", "iodepth", "numjobs", "type"])
+    for directory in dataimport.get_unique_directories(dataset):
+        for filterstring in filterstrings:
+            key = (directory, filterstring["iodepth"], filterstring["numjobs"], filterstring["type"])
+            data = index.get(key, [])
+            operation = dataimport.getMergeOperation(filterstring["type"])
+            record = {
+                "type": filterstring["type"],
+                "iodepth": filterstring["iodepth"],
+                "numjobs": filterstring["numjobs"],
+                "directory": directory,
+            }
+            for rw in settings["filter"]:
+                series = [x["data"].direction(rw) for x in data]
+                if sum(len(x) > 0 for x in series) > 1:
+                    record[rw] = get_fairness(series, operation)
+            if any(rw in record for rw in settings["filter"]):
+                records.append(record)
+    return records
+
+
+def get_scale_factor(datatype, values):
+    """Returns the scale factor and label for the values of the data type."""
+    if "lat" in datatype:
+        scale_factor = supporting.get_scale_factor_lat(values)
+    elif datatype == "bw":
+        scale_factor = supporting.get_scale_factor_bw(values)
+    else:
+        scale_factor = supporting.get_scale_factor_iops(values)
+    return scale_factor or {"scale": 1, "label": datatype}
+
+
+def chart_fairness(settings, dataset):
+    """Draws Jain's fairness index (top) and the range between the slowest
+    and the fastest job with the mean of the jobs (bottom) over time."""
+    records = get_fairness_dataset(settings, dataset)
+    if not records:
+        print("\nFairness needs log files of at least two jobs (numjobs > 1).\n")
+        sys.exit(1)
+
+    results = [
+        (record, rw, record[rw]) for record in records for rw in settings["filter"] if rw in record
+    ]
+    scale_factor = get_scale_factor(
+        settings["type"][0], np.concatenate([x[2]["mean"] for x in results])
+    )
+    #
+    # All series share the time scale of the x-axis.
+    #
+    timestamps = [x[2]["timestamps"] for x in results]
+    scaled_xaxis = supporting.scale_xaxis_time(np.concatenate(timestamps))
+    xaxis = np.split(scaled_xaxis["data"], np.cumsum([len(x) for x in timestamps])[:-1])
+
+    fig, (top, bottom) = plt.subplots(2, 1, sharex=True)
+    fig.set_size_inches(10, 7)
+    columns = decimate.get_threshold(settings, top)
+    for (record, rw, result), xvalues in zip(results, xaxis):
+        label = (
+            f"{record['directory']} {rw} qd {record['iodepth']} nj {record['numjobs']} | "
+            f"mean {result['jain'].mean():.3f} | min {result['jain'].min():.3f}"
+        )
+        x, y = decimate.decimate_line(settings, top, xvalues, result["jain"])
+        line = top.plot(x, y, linewidth=settings["line_width"], label=label)[0]
+        #
+        # The range between the slowest and fastest job is drawn as an
+        # envelope, so no single starved interval is hidden.
+        #
+        x, minimum, _, _ = decimate.envelope(xvalues, result["minimum"] / scale_factor["scale"], columns)
+        x, _, maximum, _ = decimate.envelope(xvalues, result["maximum"] / scale_factor["scale"], columns)
+        x, _, _, mean = decimate.envelope(xvalues, result["mean"] / scale_factor["scale"], columns)
+        bottom.fill_between(x, minimum, maximum, color=line.get_color(), alpha=0.3, linewidth=0)
+        bottom.plot(x, mean, color=line.get_color(), linewidth=settings["line_width"])
+
+    top.set_ylim(0, 1.05)
+    top.set_ylabel("Jain's fairness index")
+    top.legend(fontsize="x-small", loc="lower left")
+    bottom.set_ylim(bottom=0)
+    bottom.set_ylabel(f"{scale_factor['label']} per job (min-max)")
+    bottom.set_xlabel(scaled_xaxis["format"])
+    for ax in [top, bottom]:
+        ax.grid(linestyle=":")
+        ax.margins(x=0)
+
+    plt.sca(top)
+    supporting.create_title_and_sub(settings, plt, skip_keys=[])
+    plt.sca(bottom)
+    supporting.plot_source(settings, plt, bottom, -0.2)
+    supporting.plot_fio_version(settings, None, plt, bottom, -0.2)
+    supporting.save_png(settings, plt, fig)
@@ -0,0 +1,52 @@
+import os
+
+from . import compression
+
+#
+# The stat results of all files found while scanning are kept, so the log
+# cache doesn't have to stat every file again to validate its entries.
+#
+stat_cache = {}
+
+
+def classify_file(filename):
+    """Returns the kind of file: log (fio log data), json (fio output) or other."""
+    if compression.is_log_file(filename):
+        return "log"
+    if filename.endswith(".json"):
+        return "json"
+    return "other"
+
+
+def scan_directory(directory, recursive=False):
+    """Scans a directory with os.scandir and returns a dict with the absolute
+    paths of all files, sorted and classified as log, json or other. If
+    recursive is True, the whole tree below directory (for example the
+    target/blocksize/run folders generated by bench-fio) is walked once.
+    Symbolic links to directories are not followed.
+    """
+    result = {"log": [], "json": [], "other": []}
+    pending = [os.path.abspath(directory)]
+    while pending:
+        path = pending.pop()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif entry.is_file():
+                    kind = classify_file(entry.name)
+                    if kind != "other":
+                        stat_cache[entry.path] = entry.stat()
+                    result[kind].append(entry.path)
+    for kind in result.keys():
+        result[kind].sort()
+    return result
+
+
+def get_stat(path):
+    """Returns the stat result of path, from the scan if it was scanned."""
+    path = os.path.abspath(path)
+    if path in stat_cache:
+        return stat_cache[path]
+    return os.stat(path)
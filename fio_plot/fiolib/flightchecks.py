@@ -25,6 +25,15 @@ def check_if_target_directory_exists(dirpath):
             sys.exit(1)
 
 
+def check_single_benchmark(settings, option):
+    """Heatmaps combine all samples of the selected log files into a single
+    chart, so the log files must belong to a single benchmark."""
+    for key, parameter in [("iodepth", "-d"), ("numjobs", "-n"), ("input_directory", "-i")]:
+        if settings[key] and len(settings[key]) > 1:
+            print(f"\nIf {option} is specified, only one value can be used for {parameter}.\n")
+            sys.exit(1)
+
+
 def run_preflight_checks(settings):
     """This a very large function with all kinds of business logic checks.
     I don't have a good idea to clean this up yet, if that is possible."""
@@ -38,12 +47,41 @@ def run_preflight_checks(settings):
         sys.exit(1)
     try: 
         if settings["type"][0]:
-            if not settings["graphtype"] == "loggraph" and not settings["graphtype"] =="bargraph3d":
-                print("\n The -t parameter only works with -g or -L style graphs\n")
+            if settings["graphtype"] not in ["loggraph", "bargraph3d", "lba_heatmap", "latency_density", "tail_heatmap", "fairness"]:
+                print("\n The -t parameter only works with -g, -L, --lba-heatmap, --latency-density, --tail-heatmap or --fairness style graphs\n")
                 sys.exit(1)
     except TypeError:
         pass
 
+    if settings["type"] and "clat_hist" in settings["type"]:
+        if settings["graphtype"] not in ["loggraph", "tail_heatmap"]:
+            print("\nHistogram logs (-t clat_hist) can only be graphed with -g or --tail-heatmap\n")
+            sys.exit(1)
+
+    if settings["graphtype"] == "tail_heatmap" and settings["type"] != ["clat_hist"]:
+        print("\nIf --tail-heatmap is specified, you must specify -t clat_hist\n")
+        sys.exit(1)
+
+    if settings["graphtype"] == "tail_heatmap":
+        check_single_benchmark(settings, "--tail-heatmap")
+
+    if settings["graphtype"] == "lba_heatmap":
+        if not settings["type"] or len(settings["type"]) > 1:
+            print("\nIf --lba-heatmap is specified, you must specify a single type of data with -t\n")
+            sys.exit(1)
+        check_single_benchmark(settings, "--lba-heatmap")
+
+    if settings["graphtype"] == "fairness":
+        if not settings["type"] or len(settings["type"]) > 1 or settings["type"][0] == "clat_hist":
+            print("\nIf --fairness is specified, you must specify a single type of log data with -t\n")
+            sys.exit(1)
+
+    if settings["graphtype"] == "latency_density":
+        if not settings["type"] or len(settings["type"]) > 1 or "lat" not in settings["type"][0]:
+            print("\nIf --latency-density is specified, you must specify a single latency type with -t (lat, clat or slat)\n")
+            sys.exit(1)
+        check_single_benchmark(settings, "--latency-density")
+
     if settings["graphtype"] == "bargraph3d":
         if not settings["type"]:
             print("\nIf -L is specified (3D Chart) you must specify -t (iops or lat)\n")
@@ -141,6 +179,47 @@ def run_preflight_checks(settings):
             print("When processing randrw data, a -f filter (read/write) must also be specified.")
             sys.exit(1)
 
+    if settings["workers"] is not None and settings["workers"] < 0:
+        print("\nThe --workers parameter must be 0 (all CPU cores) or a positive number.\n")
+        sys.exit(1)
+
+    if settings["aggregate"] is not None and settings["aggregate"] <= 0:
+        print("\nThe --aggregate parameter must be a positive number of milliseconds.\n")
+        sys.exit(1)
+
+    if settings["time_start"] is not None and settings["time_end"] is not None:
+        if settings["time_end"] <= settings["time_start"]:
+            print("\nThe --time-end parameter must be larger than --time-start.\n")
+            sys.exit(1)
+
+    if (settings["trim_start"] or 0) < 0 or (settings["trim_end"] or 0) < 0:
+        print("\nThe --trim-start and --trim-end parameters can't be negative.\n")
+        sys.exit(1)
+
+    if settings["smooth"] and not (settings["smooth_window"] or 0) > 0:
+        print("\nThe --smooth parameter requires a positive --smooth-window.\n")
+        sys.exit(1)
+
+    if settings["percentile_accuracy"] is not None and not 0 < settings["percentile_accuracy"] < 1:
+        print("\nThe --percentile-accuracy parameter must be between 0 and 1.\n")
+        sys.exit(1)
+
+    if settings["anomalies"] or settings["stall_report"]:
+        if settings["graphtype"] != "loggraph":
+            print("\nThe --anomalies and --stall-report options only work with the -g 2D line graph.\n")
+            sys.exit(1)
+        if not (settings["anomaly_threshold"] or 0) > 0 or settings["stall_duration"] is None or settings["stall_duration"] < 0:
+            print("\nThe --anomaly-threshold must be positive and --stall-duration can't be negative.\n")
+            sys.exit(1)
+
+    if settings["steadystate"]:
+        if settings["graphtype"] != "loggraph":
+            print("\nThe --steadystate option only works with the -g 2D line graph.\n")
+            sys.exit(1)
+        if not (settings["ss_dur"] or 0) > 0 or (settings["ss_ramp"] or 0) < 0:
+            print("\nThe --ss-dur parameter must be positive and --ss-ramp can't be negative.\n")
+            sys.exit(1)
+
     if not settings["filter"][0]:
         print(f"\nNo filter parameter is set, by default it sould be 'read,write'.\n")
         sys.exit(1)
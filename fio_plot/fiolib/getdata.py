@@ -6,7 +6,11 @@ from . import(
     jsonimport,
     bar2d,
     bar3d,
-    barhistogram as histogram
+    barhistogram as histogram,
+    heatmap,
+    anomaly,
+    steadystate,
+    fairness
 )
 
 
@@ -20,7 +24,8 @@ def configure_default_settings(settings, routing_dict, key):
     return settings
 
 
-def get_log_data(settings):
+def get_raw_log_data(settings):
+    """Returns the imported log data of every log file, without merging the jobs."""
     if not settings["iodepth"]:
         settings["iodepth"] = [1]
     if not settings["numjobs"]:
@@ -28,12 +33,25 @@ def get_log_data(settings):
 
     benchmarkfiles = []
     for input_dir in settings["input_directory"]:
-        benchmarkfiles.extend(logdata.list_fio_log_files(input_dir))
+        benchmarkfiles.extend(
+            logdata.list_fio_log_files(input_dir, settings["recursive"])
+        )
     logfiles = logdata.filterLogFiles(settings, benchmarkfiles)
     # pprint.pprint(logfiles)
     rawdata = logdata.readLogDataFromFiles(settings, logfiles)
     # pprint.pprint(rawdata)
+    return rawdata
+
+
+def get_log_data(settings):
+    rawdata = get_raw_log_data(settings)
     merged = logdata.mergeDataSet(settings, rawdata)
+    if settings["anomalies"] or settings["stall_report"]:
+        anomaly.detect_anomalies(settings, merged, rawdata)
+    if settings["stall_report"]:
+        anomaly.write_report(settings, merged)
+    if settings["steadystate"]:
+        steadystate.detect_steady_state(settings, merged)
     return merged
 
 
@@ -88,6 +106,38 @@ def get_routing_dict():
             "query": None,
             "label": None,
         },
+        "lba_heatmap": {
+            "function": heatmap.chart_lba_heatmap,
+            "get_data": get_raw_log_data,
+            "iodepth_default": [1],
+            "numjobs_default": [1],
+            "query": None,
+            "label": None,
+        },
+        "latency_density": {
+            "function": heatmap.chart_latency_density,
+            "get_data": get_raw_log_data,
+            "iodepth_default": [1],
+            "numjobs_default": [1],
+            "query": None,
+            "label": None,
+        },
+        "tail_heatmap": {
+            "function": heatmap.chart_tail_heatmap,
+            "get_data": get_raw_log_data,
+            "iodepth_default": [1],
+            "numjobs_default": [1],
+            "query": None,
+            "label": None,
+        },
+        "fairness": {
+            "function": fairness.chart_fairness,
+            "get_data": get_raw_log_data,
+            "iodepth_default": [1],
+            "numjobs_default": [1],
+            "query": None,
+            "label": None,
+        },
         "compare_graph": {
             "function": bar2d.compchart_2dbarchart_jsonlogdata,
             "get_data": get_json_data,
@@ -24,6 +24,9 @@ def chart_2d_log_data(settings, dataset):
     #
     data = supporting.process_dataset(settings, dataset)
     datatypes = data["datatypes"]
+    if not datatypes:
+        print("\nNo log data left to graph, check the time window and trim parameters.\n")
+        sys.exit(1)
     directories = logdata.get_unique_directories(dataset)
 
     # pprint.pprint(data)
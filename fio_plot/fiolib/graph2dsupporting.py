@@ -4,8 +4,9 @@ import sys
 import pprint
 
 from . import (
+    decimate,
     jsonimport,
-    supporting
+    smoothing
 )
 
 
@@ -24,6 +25,8 @@ def get_json_data(settings):
 
 def create_label(settings, item, directories):
     mydir = f"{item['directory']}"
+    if "percentile" in item:
+        mydir = f"{mydir} P{item['percentile']:g}"
     return mydir
 
 
@@ -53,7 +56,7 @@ def get_padding(label, maxlabelsize):
 
 
 def scale_2dgraph_yaxis(settings, item, rw, maximum):
-    factordict = {"iops": 1.05, "lat": 1.25, "bw": 1.5}
+    factordict = {"iops": 1.05, "lat": 1.25, "bw": 1.5, "clat": 1.25, "slat": 1.25}
     min_y = 0
     if settings["min_y"] == "None":
         min_y = None
@@ -65,8 +68,10 @@ def scale_2dgraph_yaxis(settings, item, rw, maximum):
 
     max_y = maximum[rw][item["type"]] * factordict[item["type"]]
 
-    if settings[f"max_{item['type']}"]:
-        max_y = settings[f"max_{item['type']}"]
+    # --max-lat also applies to clat and slat
+    maxkey = "max_lat" if "lat" in item["type"] else f"max_{item['type']}"
+    if settings[maxkey]:
+        max_y = settings[maxkey]
 
     return (min_y, max_y)
 
@@ -109,6 +114,38 @@ def get_colors(settings):
         return colorlist
 
 
+ANOMALY_COLORS = {"stall": "red", "high": "orange", "low": "orange"}
+
+
+def draw_anomalies(axis, item, rw, xvalues):
+    """Shades the stalls and outliers found by anomaly.detect_anomalies. An
+    interval runs up to the sample after its last flagged sample."""
+    for interval in item["anomalies"].get(rw, {"intervals": []})["intervals"]:
+        last = min(interval["last_index"] + 1, len(xvalues) - 1)
+        axis.axvspan(
+            xvalues[interval["first_index"]],
+            xvalues[last],
+            color=ANOMALY_COLORS[interval["kind"]],
+            alpha=0.2,
+            linewidth=0,
+        )
+
+
+def draw_steadystate(axis, result, xvalues):
+    """Shades the regions where the steady state criterion was met (see
+    steadystate.detect_steady_state) and marks when it was first reached."""
+    for region in result["regions"]:
+        axis.axvspan(
+            xvalues[region["first_index"]],
+            xvalues[region["last_index"]],
+            color="green",
+            alpha=0.15,
+            linewidth=0,
+        )
+    if result["attained"]:
+        axis.axvline(xvalues[result["reached_index"]], color="green", linestyle="--", linewidth=1)
+
+
 def drawline(settings, item, rw, supportdata):
     axes = supportdata["axes"]
 
@@ -120,12 +157,16 @@ def drawline(settings, item, rw, supportdata):
     xvalues = item[rw]["xvalues"]
     yvalues = item[rw]["yvalues"]
 
+    if settings["anomalies"]:
+        draw_anomalies(axes[item["type"]], item, rw, xvalues)
+    if "steadystate" in item and rw in item["steadystate"]:
+        draw_steadystate(axes[item["type"]], item["steadystate"][rw], xvalues)
+
     #
-    # Use a moving average as configured by the commandline option
-    # to smooth out the graph for better readability.
+    # Use a moving average or another smoothing filter as configured by the
+    # commandline options to smooth out the graph for better readability.
     #
-    if settings["moving_average"]:
-        yvalues = supporting.running_mean(yvalues, settings["moving_average"])
+    yvalues = smoothing.smooth(settings, item[rw]["timestamps"], yvalues)
     #
     # Plotting the line
     #
@@ -133,6 +174,27 @@ def drawline(settings, item, rw, supportdata):
 
     color = get_color(settings, supportdata)
 
+    if settings["envelope"]:
+        #
+        # Every pixel column is reduced to min, max and mean: the band
+        # between min and max shows all spikes, the line is the mean.
+        #
+        columns = decimate.get_threshold(settings, axes[item["type"]])
+        xvalues, minimum, maximum, yvalues = decimate.envelope(
+            xvalues, yvalues, columns
+        )
+        axes[item["type"]].fill_between(
+            xvalues, minimum, maximum, color=color, alpha=0.3, linewidth=0
+        )
+    else:
+        #
+        # Only draw as many points as there are pixels, this keeps plotting
+        # long logs fast without changing the shape of the line.
+        #
+        xvalues, yvalues = decimate.decimate_line(
+            settings, axes[item["type"]], xvalues, yvalues
+        )
+
     axes[dataplot] = axes[item["type"]].plot(
         xvalues,
         yvalues,
@@ -0,0 +1,255 @@
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.colors as mcolors
+
+from . import dataimport, histlog, supporting
+
+#
+# The LBA heatmap shows where on the device the I/O landed over time. It is
+# made from per-I/O logs (log_avg_msec=0) with log_offset=1, which record the
+# offset of every I/O in the fifth column.
+#
+# The latency density raster shows the distribution of the latency of every
+# I/O over time, binned on a logarithmic latency scale. The tail latency
+# heatmap shows the same from histogram logs (write_hist_log), as the share
+# of I/O per latency bucket. All charts are computed with numpy and drawn as
+# a single image, so the time to draw them doesn't depend on the number of I/Os.
+#
+
+
+def get_offset_scale(maximum):
+    """Returns the scale factor and label for the offsets (bytes) on the y-axis."""
+    for scale, label in [(1024 ** 4, "TiB"), (1024 ** 3, "GiB"), (1024 ** 2, "MiB"), (1024, "KiB")]:
+        if maximum >= scale * 2:
+            return scale, label
+    return 1, "B"
+
+
+def get_samples(settings, dataset):
+    """Returns the timestamps, offsets and values of all log files of the
+    selected type and data directions, concatenated into single arrays."""
+    directions = dataimport.get_directions(settings)
+    selected = [
+        record["data"].select_directions(directions)
+        for record in dataset
+        if record["type"] == settings["type"][0]
+    ]
+    if not selected:
+        return np.empty(0), np.empty(0), np.empty(0)
+    timestamps = np.concatenate([x.timestamp for x in selected])
+    offsets = np.concatenate([x.offset for x in selected])
+    values = np.concatenate([x.value for x in selected])
+    return timestamps, offsets, values
+
+
+def get_heatmap(settings, timestamps, offsets, values):
+    """Bins (time, offset) into a 2D histogram. For iops, the number of I/Os
+    per bin is returned, for the other types the mean value per bin. Bins
+    without any I/O are masked."""
+    time_bins, offset_bins = settings["heatmap_bins"]
+    bins = [time_bins, offset_bins]
+    counts, xedges, yedges = np.histogram2d(timestamps, offsets, bins=bins)
+    if settings["type"][0] == "iops":
+        result = counts
+    else:
+        sums, _, _ = np.histogram2d(timestamps, offsets, bins=[xedges, yedges], weights=values)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = sums / counts
+    return np.ma.masked_where(counts == 0, result), xedges, yedges
+
+
+def chart_lba_heatmap(settings, dataset):
+    """Draws a heatmap of time (x-axis) and device offset (y-axis). The color
+    is the number of I/Os (iops) or the mean latency or bandwidth of the I/O
+    within each bin."""
+    timestamps, offsets, values = get_samples(settings, dataset)
+    if len(offsets) == 0 or not offsets.any():
+        print(
+            "\nThe log files don't contain any offsets. Run fio with log_offset=1 "
+            "(and log_avg_msec=0) to record the offset of every I/O.\n"
+        )
+        sys.exit(1)
+
+    heatmap, xedges, yedges = get_heatmap(settings, timestamps, offsets, values)
+
+    datatype = settings["type"][0]
+    if datatype == "iops":
+        label = "Number of I/Os"
+    else:
+        if "lat" in datatype:
+            scale_factor = supporting.get_scale_factor_lat(values)
+        else:
+            scale_factor = supporting.get_scale_factor_bw(values)
+        heatmap = heatmap / scale_factor["scale"]
+        label = f"Mean {scale_factor['label']}"
+
+    scaled_xaxis = supporting.scale_xaxis_time(xedges)
+    offset_scale, offset_label = get_offset_scale(yedges[-1])
+
+    fig, ax = plt.subplots()
+    fig.set_size_inches(10, 6)
+    mesh = ax.pcolormesh(scaled_xaxis["data"], yedges / offset_scale, heatmap.T, cmap="viridis")
+    colorbar = fig.colorbar(mesh, ax=ax)
+    colorbar.set_label(label)
+    ax.set_xlabel(scaled_xaxis["format"])
+    ax.set_ylabel(f"Offset ({offset_label})")
+
+    supporting.create_title_and_sub(settings, plt, skip_keys=[])
+    supporting.plot_source(settings, plt, ax)
+    supporting.plot_fio_version(settings, None, plt, ax)
+    supporting.save_png(settings, plt, fig)
+
+
+def get_density(settings, timestamps, values):
+    """Counts the (time, latency) pairs in bins with logarithmically spaced
+    latency edges. Returns the counts and the bin edges, the latency edges
+    as log10 of the latency."""
+    time_bins, value_bins = settings["heatmap_bins"]
+    values = np.maximum(values, 1)
+    low, high = np.log10(values.min()), np.log10(values.max())
+    if high <= low:
+        high = low + 1
+    counts, xedges, yedges = np.histogram2d(
+        timestamps, np.log10(values), bins=[time_bins, value_bins], range=[None, [low, high]]
+    )
+    return counts, xedges, yedges
+
+
+def get_latency_ticks(low, high, scale_factor):
+    """Returns the positions (log10 of the latency in ns) and labels (in the
+    unit of scale_factor) of ticks at 1, 2 and 5 times a power of ten."""
+    positions = []
+    labels = []
+    scale = scale_factor["scale"]
+    for exponent in range(int(np.floor(low)) - 1, int(np.ceil(high)) + 1):
+        for multiple in [1, 2, 5]:
+            position = np.log10(multiple) + exponent
+            if low <= position <= high:
+                positions.append(position)
+                labels.append(f"{multiple * 10 ** exponent / scale:g}")
+    return positions, labels
+
+
+def chart_latency_density(settings, dataset):
+    """Draws the number of I/Os per time and latency bin as an image, with a
+    logarithmic latency axis and color scale. Bimodal latency behaviour shows
+    as separate bands."""
+    timestamps, offsets, values = get_samples(settings, dataset)
+    if len(values) == 0:
+        print("\nNo latency log data found to draw the latency density.\n")
+        sys.exit(1)
+
+    counts, xedges, yedges = get_density(settings, timestamps, values)
+    scaled_xaxis = supporting.scale_xaxis_time(xedges)
+    scale_factor = supporting.get_scale_factor_lat(values)
+
+    fig, ax = plt.subplots()
+    fig.set_size_inches(10, 6)
+    image = ax.imshow(
+        np.ma.masked_where(counts.T == 0, counts.T),
+        origin="lower",
+        aspect="auto",
+        interpolation="nearest",
+        extent=[scaled_xaxis["data"][0], scaled_xaxis["data"][-1], yedges[0], yedges[-1]],
+        norm=mcolors.LogNorm(vmin=1, vmax=max(counts.max(), 2)),
+        cmap="inferno",
+    )
+    colorbar = fig.colorbar(image, ax=ax)
+    colorbar.set_label("Number of I/Os")
+    positions, labels = get_latency_ticks(yedges[0], yedges[-1], scale_factor)
+    ax.set_yticks(positions)
+    ax.set_yticklabels(labels)
+    ax.set_xlabel(scaled_xaxis["format"])
+    ax.set_ylabel(scale_factor["label"])
+
+    supporting.create_title_and_sub(settings, plt, skip_keys=[])
+    supporting.plot_source(settings, plt, ax)
+    supporting.plot_fio_version(settings, None, plt, ax)
+    supporting.save_png(settings, plt, fig)
+
+
+def get_histogram_series(settings, dataset):
+    """Returns the HistData of all histogram logs, limited to the selected
+    data directions. All directions are combined in the heatmap."""
+    directions = dataimport.get_directions(settings)
+    return [
+        record["data"].select_directions(directions)
+        for record in dataset
+        if record["type"].endswith("_hist")
+    ]
+
+
+def sum_groups(counts, groups, axis):
+    """Sums the rows (axis 0) or columns (axis 1) of counts that have the
+    same group number. The group numbers must be sorted."""
+    starts = np.flatnonzero(np.diff(groups, prepend=-1))
+    return np.add.reduceat(counts, starts, axis=axis), groups[starts]
+
+
+def get_tail_heatmap(settings, series):
+    """Merges the histograms of all jobs and sums them into time windows and
+    logarithmic latency buckets, as set by heatmap_bins. Returns the share (%)
+    of the I/O of a time window in each latency bucket, the time edges (msec)
+    and the latency edges (nsec). Returns None if the histograms don't
+    contain any I/O (idle or stalled jobs)."""
+    time_bins, latency_bins = settings["heatmap_bins"]
+    timestamps, counts, bin_values = histlog.merge_histograms(series)
+    if len(timestamps) == 0:
+        return None
+
+    used = np.flatnonzero(counts.sum(axis=0))
+    low = np.log10(max(bin_values[used[0]], 1))
+    high = max(np.log10(bin_values[used[-1]]), low + 1e-3)
+    latency_edges = np.logspace(low, high, latency_bins + 1)
+    buckets = np.clip(np.searchsorted(latency_edges, bin_values, side="right") - 1, 0, latency_bins - 1)
+    bucket_counts, bucket_indexes = sum_groups(counts, buckets, axis=1)
+
+    time_edges = np.linspace(timestamps[0], timestamps[-1] + 1, min(time_bins, len(timestamps)) + 1)
+    windows = np.searchsorted(time_edges, timestamps, side="right") - 1
+    window_counts, window_indexes = sum_groups(bucket_counts, windows, axis=0)
+
+    result = np.zeros((len(time_edges) - 1, latency_bins))
+    result[np.ix_(window_indexes, bucket_indexes)] = window_counts
+    totals = result.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = result / totals * 100
+    return np.ma.masked_where(result == 0, shares), time_edges, latency_edges
+
+
+def chart_tail_heatmap(settings, dataset):
+    """Draws the share of I/O per time window and latency bucket from
+    histogram logs, with logarithmic latency and color scales, so changes in
+    the tail of the latency distribution stand out."""
+    series = [x for x in get_histogram_series(settings, dataset) if len(x) > 0]
+    if not series:
+        print("\nNo histogram log data found to draw the tail latency heatmap.\n")
+        sys.exit(1)
+
+    result = get_tail_heatmap(settings, series)
+    if result is None:
+        print("\nNo histogram log data found to draw the tail latency heatmap.\n")
+        sys.exit(1)
+    shares, time_edges, latency_edges = result
+    scaled_xaxis = supporting.scale_xaxis_time(time_edges)
+    scale_factor = supporting.get_scale_factor_lat(latency_edges)
+
+    fig, ax = plt.subplots()
+    fig.set_size_inches(10, 6)
+    mesh = ax.pcolormesh(
+        scaled_xaxis["data"],
+        latency_edges / scale_factor["scale"],
+        shares.T,
+        norm=mcolors.LogNorm(vmin=max(shares.min(), 1e-3), vmax=100),
+        cmap="inferno",
+    )
+    ax.set_yscale("log")
+    colorbar = fig.colorbar(mesh, ax=ax)
+    colorbar.set_label("Share of I/O (%)")
+    ax.set_xlabel(scaled_xaxis["format"])
+    ax.set_ylabel(scale_factor["label"])
+
+    supporting.create_title_and_sub(settings, plt, skip_keys=[])
+    supporting.plot_source(settings, plt, ax)
+    supporting.plot_fio_version(settings, None, plt, ax)
+    supporting.save_png(settings, plt, fig)
@@ -0,0 +1,208 @@
+import sys
+import warnings
+import numpy as np
+
+from . import compression, logmerge
+from .logrecord import DIRECTIONS, LogData
+
+#
+# FIO writes latency histograms per log_hist_msec interval with write_hist_log
+# (*_clat_hist.N.log). Every line holds the time (msec), data direction and
+# block size, on newer fio versions followed by the command priority, and then
+# the I/O counts of the latency bins. The bins are laid out like fio's
+# plat_idx_to_val: groups of FIO_IO_U_PLAT_VAL bins per power of two. With
+# log_hist_coarseness, every 2^coarseness bins are summed into one.
+#
+FIO_IO_U_PLAT_BITS = 6
+FIO_IO_U_PLAT_VAL = 1 << FIO_IO_U_PLAT_BITS
+FIO_IO_U_PLAT_GROUP_NR = 29
+FIO_IO_U_PLAT_NR = FIO_IO_U_PLAT_GROUP_NR * FIO_IO_U_PLAT_VAL
+TIMESTAMP, RWT, BLOCKSIZE = range(3)
+
+
+class HistData:
+    """Histogram log data: one row of bin counts per interval. The bin
+    values (nsec) are shared by all rows."""
+
+    __slots__ = ("timestamp", "rwt", "blocksize", "counts", "bin_values")
+
+    def __init__(self, timestamp, rwt, blocksize, counts, bin_values):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.rwt = np.asarray(rwt, dtype=np.int8)
+        self.blocksize = np.asarray(blocksize, dtype=np.uint32)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.bin_values = np.asarray(bin_values, dtype=np.float64)
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], np.zeros((0, 0)), [])
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def select(self, selection):
+        return HistData(
+            self.timestamp[selection],
+            self.rwt[selection],
+            self.blocksize[selection],
+            self.counts[selection],
+            self.bin_values,
+        )
+
+    def select_directions(self, directions):
+        if directions is None:
+            return self
+        return self.select(np.isin(self.rwt, directions))
+
+    def select_time_window(self, window):
+        if window is None:
+            return self
+        start, end = window
+        selection = np.ones(len(self), dtype=bool)
+        if start is not None:
+            selection &= self.timestamp >= start
+        if end is not None:
+            selection &= self.timestamp <= end
+        return self.select(selection)
+
+    def direction(self, rw):
+        return self.select(self.rwt == DIRECTIONS[rw])
+
+
+def plat_idx_to_val(index, edge=0.5):
+    """Returns the latency (nsec) of fio latency bins (numpy array of bin
+    indexes), like plat_idx_to_val in fio's stat.c. Edge 0.5 is the middle of
+    a bin, 0 the lower and 1 the upper boundary."""
+    index = np.asarray(index, dtype=np.int64)
+    error_bits = np.maximum((index >> FIO_IO_U_PLAT_BITS) - 1, 0)
+    base = (1 << (error_bits + FIO_IO_U_PLAT_BITS)).astype(np.float64)
+    offset = index % FIO_IO_U_PLAT_VAL
+    values = base + (offset + edge) * (1 << error_bits)
+    return np.where(index < FIO_IO_U_PLAT_VAL << 1, index, values)
+
+
+def get_coarseness(bins):
+    """Returns log_hist_coarseness for a histogram with this many bins, or
+    None if the number of bins doesn't match fio's bin layout."""
+    for coarseness in range(FIO_IO_U_PLAT_BITS + 1):
+        if FIO_IO_U_PLAT_NR >> coarseness == bins:
+            return coarseness
+    return None
+
+
+def get_bin_values(bins):
+    """Returns the latency (nsec) of the middle of every bin. A coarse bin
+    covers 2^coarseness fio bins, its value is the middle of that range."""
+    coarseness = get_coarseness(bins)
+    stride = 1 << coarseness
+    index = np.arange(bins) * stride
+    lower = plat_idx_to_val(index, edge=0.0)
+    upper = plat_idx_to_val(index + stride - 1, edge=1.0)
+    return lower + (upper - lower) * 0.5
+
+
+def get_leading_columns(columns):
+    """Returns the number of columns before the bin counts: 3, or 4 if fio
+    also logged the command priority. Returns None for an unknown layout."""
+    for leading in [3, 4]:
+        if get_coarseness(columns - leading) is not None:
+            return leading
+    return None
+
+
+def parse_hist_buffer(buffer):
+    """Converts a bytes buffer with fio histogram log lines into HistData.
+    Returns None if the buffer is not a well-formed histogram log."""
+    buffer = buffer.strip()
+    if not buffer:
+        return HistData.empty()
+    columns = buffer.split(b"\n", 1)[0].count(b",") + 1
+    rows = buffer.count(b"\n") + 1
+    leading = get_leading_columns(columns)
+    if leading is None:
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(buffer.replace(b"\n", b","), dtype=np.int64, sep=",")
+        except (ValueError, DeprecationWarning):
+            return None
+    if values.size != rows * columns:
+        return None
+    values = values.reshape(rows, columns)
+    return HistData(
+        values[:, TIMESTAMP],
+        values[:, RWT],
+        values[:, BLOCKSIZE],
+        values[:, leading:],
+        get_bin_values(columns - leading),
+    )
+
+
+def read_hist_log(inputfile, directions=None, window=None):
+    """Reads a (compressed) histogram log file. Histogram logs are compact
+    (one line per interval), so the file is parsed as a whole."""
+    with compression.open_log_file(inputfile) as log_file:
+        dataset = parse_hist_buffer(log_file.read())
+    if dataset is None:
+        print(f"\nThe histogram log file {inputfile} could not be parsed.\n")
+        sys.exit(1)
+    return dataset.select_directions(directions).select_time_window(window)
+
+
+def coarsen(counts, bins):
+    """Sums the bins of 2D counts into the given (smaller) number of bins,
+    for jobs that were logged with a different log_hist_coarseness."""
+    factor = counts.shape[1] // bins
+    if factor == 1:
+        return counts
+    return counts.reshape(len(counts), bins, factor).sum(axis=2)
+
+
+def merge_histograms(series):
+    """Merges the histograms of a list of per-job HistData series (of one
+    data direction) by summing the bin counts of the intervals that fall in
+    the same slot of the common time grid (see logmerge). Jobs with a finer
+    bin layout are coarsened to the coarsest one. Returns the grid
+    timestamps, the summed counts and the bin values."""
+    series = [job for job in series if len(job) > 0]
+    if not series:
+        return np.empty(0, dtype=np.int64), np.zeros((0, 0)), np.empty(0)
+    interval = logmerge.get_interval(series)
+    slots = [logmerge.get_slots(job, interval) for job in series]
+    first, size = logmerge.get_grid(slots)
+    bins = min(job.counts.shape[1] for job in series)
+    counts = np.zeros((size, bins), dtype=np.int64)
+    for job, job_slots in zip(series, slots):
+        np.add.at(counts, job_slots - first, coarsen(job.counts, bins))
+    used = counts.sum(axis=1) > 0
+    timestamps = (np.nonzero(used)[0] + first) * interval
+    return timestamps, counts[used], get_bin_values(bins)
+
+
+def get_percentiles(counts, bin_values, percentiles):
+    """Returns a 2D array with the latency of every percentile (columns) for
+    every histogram (rows): the value of the first bin where the cumulative
+    count reaches the percentile of the total count."""
+    cumulative = np.cumsum(counts, axis=1)
+    totals = cumulative[:, -1:]
+    result = np.empty((len(counts), len(percentiles)))
+    for column, percentile in enumerate(percentiles):
+        reached = cumulative >= totals * (percentile / 100.0)
+        result[:, column] = bin_values[np.argmax(reached, axis=1)]
+    return result
+
+
+def merge_percentiles(data, percentiles):
+    """Merges the histogram logs of all jobs of one set of files and returns
+    one merged dataset (a dict with LogData per direction) per percentile."""
+    merged = [{"read": LogData.empty(), "write": LogData.empty()} for x in percentiles]
+    for rw in ["read", "write"]:
+        series = [record["data"].direction(rw) for record in data]
+        timestamps, counts, bin_values = merge_histograms(series)
+        if len(timestamps) == 0:
+            continue
+        values = get_percentiles(counts, bin_values, percentiles)
+        for column in range(len(percentiles)):
+            merged[column][rw] = LogData(timestamps, values[:, column])
+    return merged
@@ -19,10 +19,11 @@ def read_ini_file(filename):
 
 def get_settings_from_ini(args):
     listtypes = ['input_directory','filter','colors','type']
-    listinttypes = ['iodepth','numjobs']
-    integers = ['maxdepth','maxjobs','dpi','max_z','max_lat','max_iops','max_bw','xlabel_depth','xlabel_parent','xlabel_segment_size','line_width','source_fontsize','subtitle_fontsize','title_fontsize']
-    floats = ['percentile']
-    booltypes = ['show_cpu','show_ss','table_lines','disable_grid','enable_markers','disable_fio_version','moving_average']
+    listinttypes = ['iodepth','numjobs','heatmap_bins']
+    listfloattypes = ['hist_percentiles']
+    integers = ['maxdepth','maxjobs','dpi','max_z','max_lat','max_iops','max_bw','xlabel_depth','xlabel_parent','xlabel_segment_size','line_width','source_fontsize','subtitle_fontsize','title_fontsize','workers','cache_size','aggregate','moving_average']
+    floats = ['percentile','time_start','time_end','trim_start','trim_end','smooth_window','smooth_percentile','percentile_accuracy','anomaly_threshold','stall_duration','ss_dur','ss_ramp']
+    booltypes = ['show_cpu','show_ss','table_lines','disable_grid','enable_markers','disable_fio_version','no_cache','recursive','no_decimate','envelope','anomalies','no_render']
     returndict = {}
     if len(args) > 1:
         if not "-" in args[1][0]:
@@ -34,6 +35,8 @@ def get_settings_from_ini(args):
                         returndict[y] = config.getlist(x, y)
                     elif y in listinttypes:
                         returndict[y] = [ int(item) for item in config.getlist(x,y)]
+                    elif y in listfloattypes:
+                        returndict[y] = [ float(item) for item in config.getlist(x,y)]
                     elif y in integers:
                         try: 
                             returndict[y] = config.getint(x,y)
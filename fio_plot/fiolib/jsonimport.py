@@ -4,6 +4,8 @@ import json
 import logging
 import pprint
 
+from . import filescan
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,12 +33,18 @@ def list_json_files(settings, fail=True):
     input_directories = []
     for directory in settings["input_directory"]:
         absolute_dir = os.path.abspath(directory)
-        input_dir_struct = {"directory": absolute_dir, "files": []}
-        input_dir_files = os.listdir(absolute_dir)
-        for file in input_dir_files:
-            if file.endswith(".json"):
-                input_dir_struct["files"].append(os.path.join(absolute_dir, file))
-        input_directories.append(input_dir_struct)
+        json_files = filescan.scan_directory(absolute_dir, settings["recursive"])["json"]
+        if settings["recursive"]:
+            # Every directory with JSON files within the tree becomes a data source
+            folders = sorted(set(os.path.dirname(x) for x in json_files)) or [absolute_dir]
+        else:
+            folders = [absolute_dir]
+        for folder in folders:
+            input_dir_struct = {"directory": folder, "files": []}
+            for file in json_files:
+                if os.path.dirname(file) == folder:
+                    input_dir_struct["files"].append(file)
+            input_directories.append(input_dir_struct)
 
     for directory in input_directories:
         file_list = []
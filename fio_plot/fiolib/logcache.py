@@ -0,0 +1,153 @@
+import os
+import hashlib
+import logging
+import tempfile
+import zipfile
+import numpy as np
+
+from . import defaultsettings, filescan
+from .logrecord import LogData
+
+logger = logging.getLogger(__name__)
+
+#
+# Bump this version if the parsed representation of a log file changes, so
+# existing cache entries are no longer used.
+#
+CACHE_VERSION = 2
+CACHE_COLUMNS = ["timestamp", "value", "rwt", "blocksize", "offset"]
+
+#
+# The columns are stored per data direction (e.g. value_0 holds the values of
+# the reads), so only the directions that are needed are loaded from disk.
+#
+
+
+def get_cache_directory(settings):
+    """Returns the directory where parsed log files are cached. By default
+    this is the fio-plot folder within the XDG cache directory."""
+    if settings["cache_dir"]:
+        return os.path.abspath(settings["cache_dir"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "fio-plot")
+
+
+def cache_enabled(settings):
+    return not settings["no_cache"]
+
+
+def get_cache_key(inputfile):
+    """The cache key is based on the absolute path, size and modification
+    time of the log file. If the log file changes, the key changes."""
+    absolute_path = os.path.abspath(inputfile)
+    stat = filescan.get_stat(absolute_path)
+    raw_key = f"{CACHE_VERSION}:{absolute_path}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(raw_key.encode()).hexdigest()
+
+
+def get_cache_filename(settings, inputfile):
+    return os.path.join(get_cache_directory(settings), f"{get_cache_key(inputfile)}.npz")
+
+
+def load(settings, inputfile, directions=None):
+    """Returns the cached LogData of inputfile or None if there is no valid
+    cache entry. Only the data directions (rwt values) in directions are
+    loaded, or all of them if directions is None. A cache hit marks the entry
+    as recently used."""
+    if not cache_enabled(settings):
+        return None
+    cachefile = get_cache_filename(settings, inputfile)
+    try:
+        with np.load(cachefile) as cached:
+            stored = sorted(int(x.split("_")[1]) for x in cached.files if x.startswith("rwt_"))
+            if directions is not None:
+                stored = [x for x in stored if x in directions]
+            columns = []
+            for column in CACHE_COLUMNS:
+                parts = [cached[f"{column}_{rwt}"] for rwt in stored]
+                columns.append(np.concatenate(parts) if parts else None)
+        os.utime(cachefile)
+        if not stored:
+            return LogData.empty()
+        return LogData(*columns)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        logger.debug(f"Ignoring invalid cache entry for {inputfile}: {e}")
+        remove(cachefile)
+        return None
+
+
+def store(settings, inputfile, logdata):
+    """Stores the parsed LogData of inputfile in the cache, which should contain
+    all data directions of the log file. The file is written
+    under a temporary name first, so concurrent readers never see a partial
+    entry. Caching is best-effort: errors are logged and otherwise ignored.
+    Entries larger than the cache itself are not stored at all, they would
+    be evicted right away."""
+    if not cache_enabled(settings):
+        return
+    size = sum(getattr(logdata, column).nbytes for column in CACHE_COLUMNS)
+    if size > get_maximum_size(settings):
+        logger.debug(f"Not caching {inputfile}: larger than the cache size")
+        return
+    temporary = None
+    try:
+        cachedir = get_cache_directory(settings)
+        os.makedirs(cachedir, exist_ok=True)
+        cachefile = get_cache_filename(settings, inputfile)
+        descriptor, temporary = tempfile.mkstemp(dir=cachedir, suffix=".tmp")
+        arrays = {}
+        for rwt in np.unique(logdata.rwt):
+            selection = logdata.rwt == rwt
+            for column in CACHE_COLUMNS:
+                arrays[f"{column}_{rwt}"] = getattr(logdata, column)[selection]
+        with os.fdopen(descriptor, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temporary, cachefile)
+        evict(settings)
+    except OSError as e:
+        logger.debug(f"Could not cache {inputfile}: {e}")
+        if temporary:
+            remove(temporary)
+
+
+def remove(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
+def get_maximum_size(settings):
+    """Returns the maximum size of the cache in bytes. A blank cache_size in
+    an ini file (None) means the default size."""
+    cache_size = settings["cache_size"]
+    if cache_size is None:
+        cache_size = defaultsettings.get_default_settings()["cache_size"]
+    return cache_size * 1024 * 1024
+
+
+def evict(settings):
+    """Removes the least recently used cache entries until the cache is
+    smaller than the configured maximum size (in MB)."""
+    maximum = get_maximum_size(settings)
+    entries = []
+    total = 0
+    with os.scandir(get_cache_directory(settings)) as it:
+        for entry in it:
+            if entry.name.endswith(".npz"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+    for mtime, size, path in sorted(entries):
+        if total <= maximum:
+            break
+        remove(path)
+        total -= size
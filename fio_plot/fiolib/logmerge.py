@@ -0,0 +1,118 @@
+import numpy as np
+
+from .logrecord import LogData
+
+#
+# FIO writes a separate log file for every job. The timestamps of those jobs
+# are never exactly the same: they skew a few msec and jobs may start or stop
+# at different moments. Before the jobs are merged, every job is resampled
+# onto a common time grid with a step size of the log interval.
+#
+# FIO doesn't log an interval in which a job did no I/O, so a missing sample
+# within the runtime of a job is a real gap, not a sample that got lost. For
+# the summed data types (iops, bw) such a slot is 0, for the averaged data
+# types (latency) there is no value, so the slot is left out of the mean.
+#
+
+
+def get_interval(series):
+    """Returns the log interval (msec) of a list of per-job LogData series:
+    the smallest of the median distances between consecutive samples of a job.
+    Jobs with gaps in their log don't inflate the interval that way."""
+    medians = []
+    for job in series:
+        distances = np.diff(job.timestamp)
+        distances = distances[distances > 0]
+        if len(distances) > 0:
+            medians.append(np.median(distances))
+    if not medians:
+        return 1000
+    return max(int(min(medians)), 1)
+
+
+def get_slots(job, interval):
+    return np.rint(job.timestamp / interval).astype(np.int64)
+
+
+def get_grid(slots):
+    """Returns the first slot and the number of slots of the common time grid
+    that covers all jobs (slots is a list with the slots of each job)."""
+    first = int(min(x.min() for x in slots))
+    last = int(max(x.max() for x in slots))
+    return first, last - first + 1
+
+
+def get_gap_value(operation):
+    """Returns the value of a slot without a sample within the runtime of a
+    job: 0 for the 'sum' operation and NaN (no value) for 'mean'."""
+    return 0.0 if operation == "sum" else np.nan
+
+
+def resample_job(job, slots, first, size, operation):
+    """Resamples a single job onto the common grid. Samples are assigned to the
+    nearest slot (multiple samples within a slot are averaged) and gaps within
+    the runtime of the job are filled with the gap value of the operation (see
+    get_gap_value). Slots outside of the runtime of the job are NaN: the job
+    was not running.
+    """
+    row = np.full(size, np.nan)
+    slots = slots - first
+    counts = np.bincount(slots, minlength=size)
+    sums = np.bincount(slots, weights=job.value.astype(np.float64), minlength=size)
+    used = np.nonzero(counts)[0]
+    row[used[0]:used[-1] + 1] = get_gap_value(operation)
+    row[used] = sums[used] / counts[used]
+    return row
+
+
+def prepare_jobs(series, interval):
+    """Drops empty jobs and returns the remaining jobs with their slots."""
+    series = [job for job in series if len(job) > 0]
+    slots = [get_slots(job, interval) for job in series]
+    return series, slots
+
+
+def align_jobs(series, operation="mean", interval=None):
+    """Returns the common time grid (msec) and a 2D array with one row per job,
+    containing the resampled values of all jobs (see resample_job). The
+    operation is the merge operation of the data type (see merge_jobs). Jobs
+    without any samples are left out."""
+    if interval is None:
+        interval = get_interval(series)
+    series, slots = prepare_jobs(series, interval)
+    first, size = get_grid(slots)
+    grid = (np.arange(size, dtype=np.int64) + first) * interval
+    matrix = np.vstack(
+        [resample_job(job, x, first, size, operation) for job, x in zip(series, slots)]
+    )
+    return grid, matrix
+
+
+def merge_jobs(series, operation):
+    """Merges a list of per-job LogData series into one LogData series.
+    The operation is either 'sum' (iops, bw) or 'mean' (latency). The jobs are
+    accumulated one by one, so only a single resampled job is kept in memory
+    next to the result. A single job is returned as is: there is nothing to
+    align, and resampling would average samples that share a time slot."""
+    jobs = [job for job in series if len(job) > 0]
+    if not jobs:
+        return LogData.empty()
+    if len(jobs) == 1:
+        return jobs[0]
+    interval = get_interval(jobs)
+    series, slots = prepare_jobs(jobs, interval)
+    first, size = get_grid(slots)
+    total = np.zeros(size)
+    count = np.zeros(size, dtype=np.int64)
+    for job, job_slots in zip(series, slots):
+        row = resample_job(job, job_slots, first, size, operation)
+        running = ~np.isnan(row)
+        total[running] += row[running]
+        count[running] += 1
+
+    used = count > 0
+    values = total[used]
+    if operation == "mean":
+        values = values / count[used]
+    timestamps = (np.nonzero(used)[0] + first) * interval
+    return LogData(timestamps, values)
@@ -0,0 +1,238 @@
+import os
+import mmap
+import warnings
+import numpy as np
+
+from . import compression
+
+#
+# FIO log files contain up to five columns that are relevant to us:
+# time (msec), value, data direction, block size and offset. Newer versions
+# of fio may add more columns (like the command priority), which are ignored.
+#
+LOG_COLUMNS = ["timestamp", "value", "rwt", "blocksize", "offset"]
+TIMESTAMP, VALUE, RWT, BLOCKSIZE, OFFSET = range(len(LOG_COLUMNS))
+
+
+#
+# Large log files are read and converted in pieces of this size (bytes).
+#
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def empty_log_array():
+    return np.empty((0, len(LOG_COLUMNS)), dtype=np.int64)
+
+
+def has_columns(buffer, columns):
+    """Returns True if every line of the buffer has the number of columns."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    commas = np.flatnonzero(data == ord(","))
+    newlines = np.flatnonzero(data == ord("\n"))
+    per_line = np.diff(np.searchsorted(commas, newlines), prepend=0, append=len(commas))
+    return bool(np.all(per_line == columns - 1))
+
+
+def parse_log_buffer(buffer):
+    """Converts a bytes buffer containing complete fio log lines into a 2D
+    int64 array with one row per sample and one column per LOG_COLUMNS entry.
+
+    Whitespace around the separators is ignored, just like the csv based parser
+    does. If the buffer is not a well-formed fio log (empty lines, text,
+    floating-point values, a varying number of columns) None is returned so
+    the caller can fall back to the csv based parser.
+    """
+    buffer = buffer.strip()
+    if not buffer:
+        return empty_log_array()
+
+    first_line = buffer.split(b"\n", 1)[0]
+    columns = first_line.count(b",") + 1
+    rows = buffer.count(b"\n") + 1
+    if columns < 4:
+        return None
+    # Every line must have as many columns as the first one. Only comparing
+    # the total number of values would accept lines with different numbers of
+    # columns that happen to add up, and shift the values of the rows.
+    if not has_columns(buffer, columns):
+        return None
+
+    with warnings.catch_warnings():
+        # Older numpy versions only warn about data that can't be parsed
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(
+                buffer.replace(b"\n", b","), dtype=np.int64, sep=","
+            )
+        except (ValueError, DeprecationWarning):
+            return None
+
+    if values.size != rows * columns:
+        return None
+
+    values = values.reshape(rows, columns)
+    result = np.zeros((rows, len(LOG_COLUMNS)), dtype=np.int64)
+    used = min(columns, len(LOG_COLUMNS))
+    result[:, :used] = values[:, :used]
+    return result
+
+
+def select_directions(chunk, directions):
+    """Returns only the rows of a parsed chunk with a data direction (rwt
+    value) in directions. If directions is None, all rows are returned."""
+    if chunk is None or directions is None:
+        return chunk
+    return chunk[np.isin(chunk[:, RWT], directions)]
+
+
+def iter_buffer_chunks(buffer, chunk_size=CHUNK_SIZE, start=0, end=None):
+    """Yields consecutive pieces of buffer (bytes or mmap) of roughly
+    chunk_size bytes that always end at a line boundary. Only one piece at a
+    time is copied out of the buffer. The optional start and end offsets
+    limit the region of the buffer that is read; they should be line boundaries.
+    """
+    size = len(buffer) if end is None else end
+    while start < size:
+        stop = start + chunk_size
+        if stop < size:
+            newline = buffer.rfind(b"\n", start, stop)
+            if newline < 0:
+                newline = buffer.find(b"\n", stop, size)
+            stop = size if newline < 0 else newline + 1
+        else:
+            stop = size
+        yield buffer[start:stop]
+        start = stop
+
+
+def count_lines(buffer, chunk_size=CHUNK_SIZE, start=0, end=None):
+    """Returns the number of lines in buffer (bytes or mmap), or the region
+    between the start and end offsets, scanning it in pieces of chunk_size bytes."""
+    size = len(buffer) if end is None else end
+    if size <= start:
+        return 0
+    lines = 0
+    for position in range(start, size, chunk_size):
+        lines += buffer[position:min(position + chunk_size, size)].count(b"\n")
+    if buffer[size - 1:size] != b"\n":
+        lines += 1
+    return lines
+
+
+def line_start_after(buffer, position):
+    """Returns the offset of the first line in buffer that starts at or after position."""
+    if position <= 0:
+        return 0
+    newline = buffer.find(b"\n", position - 1)
+    return len(buffer) if newline < 0 else newline + 1
+
+
+def read_timestamp(buffer, offset):
+    """Returns the timestamp of the line starting at offset or None."""
+    separator = buffer.find(b",", offset, offset + 64)
+    if separator < 0:
+        return None
+    try:
+        return int(buffer[offset:separator])
+    except ValueError:
+        return None
+
+
+def find_timestamp_offset(buffer, timestamp):
+    """Returns the offset of the first line with a timestamp >= timestamp.
+    FIO writes its log timestamps in increasing order, so this is a binary
+    search over the byte offsets of the buffer: only a few lines are read.
+    """
+    low, high = 0, len(buffer)
+    while low < high:
+        middle = (low + high) // 2
+        start = line_start_after(buffer, middle)
+        value = read_timestamp(buffer, start) if start < len(buffer) else None
+        if value is None or value >= timestamp:
+            high = middle
+        else:
+            low = middle + 1
+    return line_start_after(buffer, low)
+
+
+def get_time_range(buffer):
+    """Returns the timestamps of the first and the last line of buffer, or
+    None if they can't be read. Only those two lines are read."""
+    end = len(buffer)
+    while end > 0 and buffer[end - 1:end] in (b"\n", b"\r", b" "):
+        end -= 1
+    if end == 0:
+        return None
+    first = read_timestamp(buffer, 0)
+    last = read_timestamp(buffer, buffer.rfind(b"\n", 0, end) + 1)
+    if first is None or last is None:
+        return None
+    return first, last
+
+
+def find_window_offsets(buffer, window):
+    """Returns the start and end offset of the lines within the time window
+    (start, end) in msec. Either side of the window may be None (open)."""
+    start, end = window
+    first = 0 if start is None else find_timestamp_offset(buffer, start)
+    last = len(buffer) if end is None else find_timestamp_offset(buffer, end + 1)
+    return first, max(first, last)
+
+
+def select_time_window(chunk, window):
+    """Returns only the rows of a parsed chunk within the time window (start,
+    end) in msec. If window is None, all rows are returned."""
+    if chunk is None or window is None:
+        return chunk
+    start, end = window
+    selection = np.ones(len(chunk), dtype=bool)
+    if start is not None:
+        selection &= chunk[:, TIMESTAMP] >= start
+    if end is not None:
+        selection &= chunk[:, TIMESTAMP] <= end
+    return chunk[selection]
+
+
+def past_time_window(chunk, window):
+    """Returns True if all rows of a parsed chunk are past the end of the
+    time window, so reading can stop."""
+    if chunk is None or window is None or window[1] is None or len(chunk) == 0:
+        return False
+    return chunk[0, TIMESTAMP] > window[1]
+
+
+def iter_stream_chunks(fileobj, chunk_size=CHUNK_SIZE):
+    """Yields pieces of roughly chunk_size bytes that end at a line boundary,
+    read from a (decompressing) file object."""
+    remainder = b""
+    while True:
+        data = fileobj.read(chunk_size)
+        if not data:
+            break
+        data = remainder + data
+        newline = data.rfind(b"\n")
+        if newline < 0:
+            remainder = data
+            continue
+        yield data[: newline + 1]
+        remainder = data[newline + 1 :]
+    if remainder:
+        yield remainder
+
+
+def iter_file_chunks(inputfile, chunk_size=CHUNK_SIZE, window=None):
+    """Yields pieces of the log file that end at a line boundary. Plain log
+    files are memory-mapped, compressed log files are decompressed while
+    they are being read. If a time window is given, plain files are only read
+    from the start of the window up to its end (see find_window_offsets).
+    Compressed files can't seek, so they are read from the start."""
+    if compression.is_compressed(inputfile):
+        with compression.open_log_file(inputfile) as log_file:
+            yield from iter_stream_chunks(log_file, chunk_size)
+    elif os.path.getsize(inputfile) > 0:
+        with open(inputfile, "rb") as log_file:
+            with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                start, end = 0, None
+                if window:
+                    start, end = find_window_offsets(mapped, window)
+                yield from iter_buffer_chunks(mapped, chunk_size, start, end)
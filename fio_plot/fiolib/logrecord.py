@@ -0,0 +1,127 @@
+import numpy as np
+
+from . import logparser
+
+#
+# The data direction as recorded by fio in the third column of a log file.
+#
+DIRECTIONS = {"read": 0, "write": 1, "trim": 2}
+
+
+class LogData:
+    """Columnar representation of fio log data, shared by the import, merge
+    and plotting stages. Every field is a single numpy array with a compact
+    data type, so a log file costs roughly its raw data size in memory.
+
+    Direction masks are computed once and cached, as the same data is queried
+    for read and write multiple times.
+    """
+
+    __slots__ = ("timestamp", "value", "rwt", "blocksize", "offset", "_masks")
+
+    def __init__(self, timestamp, value, rwt=None, blocksize=None, offset=None):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.value = np.asarray(value)
+        size = len(self.timestamp)
+        self.rwt = np.zeros(size, dtype=np.int8) if rwt is None else np.asarray(rwt, dtype=np.int8)
+        self.blocksize = np.zeros(size, dtype=np.uint32) if blocksize is None else np.asarray(blocksize, dtype=np.uint32)
+        self.offset = np.zeros(size, dtype=np.int64) if offset is None else np.asarray(offset, dtype=np.int64)
+        self._masks = {}
+
+    @classmethod
+    def from_array(cls, array):
+        """Creates a LogData object from the 2D array returned by the logparser."""
+        return cls(
+            np.ascontiguousarray(array[:, logparser.TIMESTAMP]),
+            np.ascontiguousarray(array[:, logparser.VALUE]),
+            array[:, logparser.RWT],
+            array[:, logparser.BLOCKSIZE],
+            array[:, logparser.OFFSET],
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks, size):
+        """Creates a LogData object from an iterable of 2D arrays as returned by
+        the logparser. The columns are allocated once for (at most) size samples
+        and filled chunk by chunk, so only one chunk is held next to the result.
+        Returns None if one of the chunks could not be parsed (None).
+        """
+        result = cls(
+            np.empty(size, dtype=np.int64),
+            np.empty(size, dtype=np.int64),
+            np.empty(size, dtype=np.int8),
+            np.empty(size, dtype=np.uint32),
+            np.empty(size, dtype=np.int64),
+        )
+        position = 0
+        for chunk in chunks:
+            if chunk is None:
+                return None
+            end = position + len(chunk)
+            if end > size:
+                return None
+            result.timestamp[position:end] = chunk[:, logparser.TIMESTAMP]
+            result.value[position:end] = chunk[:, logparser.VALUE]
+            result.rwt[position:end] = chunk[:, logparser.RWT]
+            result.blocksize[position:end] = chunk[:, logparser.BLOCKSIZE]
+            result.offset[position:end] = chunk[:, logparser.OFFSET]
+            position = end
+        if position < size:
+            # Rows were filtered out or trailing empty lines were counted. The
+            # memory of the unused part of the columns was never written to.
+            return cls(
+                result.timestamp[:position],
+                result.value[:position],
+                result.rwt[:position],
+                result.blocksize[:position],
+                result.offset[:position],
+            )
+        return result
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def mask(self, rw):
+        """Returns a boolean mask selecting the samples of direction rw (read/write/trim)."""
+        if rw not in self._masks:
+            self._masks[rw] = self.rwt == DIRECTIONS[rw]
+        return self._masks[rw]
+
+    def select(self, selection):
+        """Returns a new LogData object with only the selected samples
+        (boolean mask, index array or slice)."""
+        return LogData(
+            self.timestamp[selection],
+            self.value[selection],
+            self.rwt[selection],
+            self.blocksize[selection],
+            self.offset[selection],
+        )
+
+    def select_directions(self, directions):
+        """Returns a new LogData object with only the samples that have a data
+        direction (rwt value) in directions, or self if directions is None."""
+        if directions is None:
+            return self
+        return self.select(np.isin(self.rwt, directions))
+
+    def select_time_window(self, window):
+        """Returns a new LogData object with only the samples within the time
+        window (start, end) in msec, or self if window is None."""
+        if window is None:
+            return self
+        start, end = window
+        selection = np.ones(len(self), dtype=bool)
+        if start is not None:
+            selection &= self.timestamp >= start
+        if end is not None:
+            selection &= self.timestamp <= end
+        return self.select(selection)
+
+    def direction(self, rw):
+        """Returns a new LogData object containing only the samples for rw."""
+        return self.select(self.mask(rw))
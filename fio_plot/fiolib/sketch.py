@@ -0,0 +1,118 @@
+import numpy as np
+
+#
+# A mergeable quantile sketch in the style of DDSketch (Masson et al., 2019).
+# Values are counted in logarithmically sized buckets, so any quantile is
+# returned with a relative error of at most the configured accuracy. The
+# count, mean, variance, minimum and maximum are kept exactly. Sketches of
+# different jobs or runs can be merged without keeping the samples.
+#
+DEFAULT_ACCURACY = 0.01
+
+#
+# Values below this are counted in a separate bucket for zero. Log data is
+# never negative; negative values end up in the zero bucket as well.
+#
+MIN_VALUE = 1e-9
+
+
+class QuantileSketch:
+    """Streaming summary of a series of values: add the values in one or
+    more chunks, then query mean, stdev, max and quantiles."""
+
+    def __init__(self, accuracy=DEFAULT_ACCURACY):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.first_key = 0
+        self.zero_count = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    @classmethod
+    def from_values(cls, values, accuracy=DEFAULT_ACCURACY):
+        sketch = cls(accuracy)
+        sketch.add(values)
+        return sketch
+
+    def add_counts(self, first_key, counts):
+        """Adds bucket counts starting at first_key to the buckets of the sketch."""
+        if len(counts) == 0:
+            return
+        if len(self.counts) == 0:
+            self.first_key = first_key
+            self.counts = counts.copy()
+            return
+        start = min(self.first_key, first_key)
+        end = max(self.first_key + len(self.counts), first_key + len(counts))
+        merged = np.zeros(end - start, dtype=np.int64)
+        merged[self.first_key - start:self.first_key - start + len(self.counts)] += self.counts
+        merged[first_key - start:first_key - start + len(counts)] += counts
+        self.first_key = start
+        self.counts = merged
+
+    def add_moments(self, count, mean, m2, minimum, maximum):
+        """Combines count, mean and sum of squared deviations with those of
+        the sketch (Chan et al.), which is numerically stable."""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+
+    def add(self, values):
+        """Adds a chunk of values to the sketch in one vectorized pass."""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return self
+        positive = values[values > MIN_VALUE]
+        self.zero_count += len(values) - len(positive)
+        if len(positive) > 0:
+            keys = np.ceil(np.log(positive) / self.log_gamma).astype(np.int64)
+            first_key = int(keys.min())
+            self.add_counts(first_key, np.bincount(keys - first_key))
+        mean = values.mean()
+        self.add_moments(
+            len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max()
+        )
+        return self
+
+    def merge(self, other):
+        """Adds the values summarized by another sketch with the same accuracy."""
+        if other.accuracy != self.accuracy:
+            raise ValueError("Only sketches with the same accuracy can be merged.")
+        self.zero_count += other.zero_count
+        self.add_counts(other.first_key, other.counts)
+        self.add_moments(other.count, other.mean, other.m2, other.minimum, other.maximum)
+        return self
+
+    def stdev(self):
+        """Returns the population standard deviation (like np.std)."""
+        if self.count == 0:
+            return 0.0
+        return float(np.sqrt(self.m2 / self.count))
+
+    def quantile(self, quantile):
+        """Returns the value at quantile (0-1) with a relative error of at
+        most the accuracy of the sketch. The minimum and maximum are exact."""
+        if self.count == 0:
+            return np.nan
+        rank = quantile * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.minimum, 0.0)
+        cumulative = np.cumsum(self.counts) + self.zero_count
+        index = int(np.searchsorted(cumulative, rank, side="right"))
+        index = min(index, len(self.counts) - 1)
+        value = 2 * self.gamma ** (self.first_key + index) / (self.gamma + 1)
+        return float(min(max(value, self.minimum), self.maximum))
+
+    def percentile(self, percentile):
+        return self.quantile(percentile / 100.0)
@@ -0,0 +1,146 @@
+from bisect import bisect_left, insort
+import numpy as np
+
+#
+# Smoothing filters for log data. All filters are vectorized with numpy and
+# share the edge semantics of the original running mean: the first window-1
+# points are computed over the samples seen so far (an expanding window).
+#
+FILTERS = ["sma", "ewma", "median", "percentile"]
+
+#
+# The rolling median and percentile are computed for this many values
+# (rows times window) at a time, which bounds the memory usage.
+#
+BLOCK_SIZE = 4 * 1024 * 1024
+
+#
+# Sorting every window costs O(n * w * log w). Larger windows, like the time
+# based windows of --smooth-unit seconds, are kept in a sorted list that is
+# updated one sample at a time instead, in O(n * log w) comparisons.
+#
+SORTED_WINDOW_SIZE = 256
+
+
+def simple_moving_average(values, window):
+    """Returns the running mean over window samples, computed with a
+    cumulative sum in O(n)."""
+    values = np.asarray(values, dtype=np.float64)
+    window = max(int(window), 1)
+    total = np.cumsum(values)
+    result = np.empty(len(values))
+    result[:window] = total[:window] / np.arange(1, min(window, len(values)) + 1)
+    result[window:] = (total[window:] - total[:-window]) / window
+    return result
+
+
+def exponential_moving_average(values, window):
+    """Returns the exponentially weighted moving average with a span of
+    window samples (alpha = 2 / (window + 1)), starting at the first value.
+
+    The recursion y[i] = alpha * x[i] + (1 - alpha) * y[i - 1] is solved
+    per block with cumulative sums of scaled values. The blocks are kept
+    small enough to prevent the scale factors from overflowing.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    alpha = 2.0 / (max(window, 1) + 1)
+    if alpha >= 1 or len(values) == 0:
+        return values.copy()
+    decay = 1 - alpha
+    block = int(min(max(250 / -np.log10(decay), 1), 4096))
+    powers = decay ** np.arange(block)
+    result = np.empty(len(values))
+    # Starting with y[-1] = x[0] results in y[0] = x[0].
+    previous = values[0]
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        size = len(chunk)
+        scale = powers[:size]
+        weighted = np.cumsum(chunk / scale) * alpha
+        result[start:start + size] = (weighted + previous * decay) * scale
+        previous = result[start + size - 1]
+    return result
+
+
+def sorted_window_percentile(values, window, percentile):
+    """Returns the rolling percentile over window samples, like
+    rolling_percentile. The samples of the window are kept in a sorted list:
+    every step removes the oldest sample and inserts the new one."""
+    result = np.empty(len(values))
+    samples = values.tolist()
+    ordered = []
+    fraction = percentile / 100.0
+    for index, value in enumerate(samples):
+        if index >= window:
+            del ordered[bisect_left(ordered, samples[index - window])]
+        insort(ordered, value)
+        position = (len(ordered) - 1) * fraction
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        result[index] = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+    return result
+
+
+def rolling_percentile(values, window, percentile=50):
+    """Returns the rolling percentile (the median by default) over window
+    samples. The windows are sorted as a sliding window view, in blocks of
+    rows, and the percentile is linearly interpolated like np.percentile.
+    The first rows are padded with NaN, which is sorted last. Windows larger
+    than SORTED_WINDOW_SIZE use sorted_window_percentile."""
+    values = np.asarray(values, dtype=np.float64)
+    window = max(int(window), 1)
+    if window > SORTED_WINDOW_SIZE:
+        return sorted_window_percentile(values, window, percentile)
+    size = len(values)
+    padded = np.concatenate((np.full(window - 1, np.nan), values))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    result = np.empty(size)
+    rows = max(BLOCK_SIZE // window, 1)
+    for start in range(0, size, rows):
+        block = np.sort(windows[start:start + rows], axis=1)
+        counts = np.minimum(np.arange(start, start + len(block)) + 1, window)
+        position = (counts - 1) * percentile / 100.0
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, counts - 1)
+        fraction = position - lower
+        low = np.take_along_axis(block, lower[:, None], axis=1)[:, 0]
+        high = np.take_along_axis(block, upper[:, None], axis=1)[:, 0]
+        result[start:start + len(block)] = low + (high - low) * fraction
+    return result
+
+
+def get_window_size(settings, timestamps):
+    """Returns the smoothing window in samples. With the seconds unit, the
+    window is converted using the median interval (msec) between timestamps."""
+    window = settings["smooth_window"]
+    if settings["smooth_unit"] == "seconds":
+        intervals = np.diff(np.asarray(timestamps))
+        interval = np.median(intervals) if len(intervals) > 0 else 1000
+        window = window * 1000 / max(interval, 1)
+    return max(int(round(window)), 1)
+
+
+def get_filter(settings):
+    """Returns the selected filter and window: --smooth, or the simple moving
+    average of --moving-average. Returns (None, None) if nothing is selected."""
+    if settings["smooth"]:
+        return settings["smooth"], settings["smooth_window"]
+    if settings["moving_average"]:
+        return "sma", settings["moving_average"]
+    return None, None
+
+
+def smooth(settings, timestamps, values):
+    """Applies the smoothing filter selected in settings to values."""
+    smoother, window = get_filter(settings)
+    if smoother is None or not window:
+        return values
+    if settings["smooth"]:
+        window = get_window_size(settings, timestamps)
+    if smoother == "sma":
+        return simple_moving_average(values, window)
+    if smoother == "ewma":
+        return exponential_moving_average(values, window)
+    if smoother == "median":
+        return rolling_percentile(values, window)
+    return rolling_percentile(values, window, settings["smooth_percentile"])
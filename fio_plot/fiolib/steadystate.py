@@ -0,0 +1,158 @@
+import sys
+import numpy as np
+
+from . import anomaly
+
+#
+# Offline steady state detection, with the criteria of the steady state
+# options of fio (ss, ss_dur and ss_ramp). A criterion like iops:10% or
+# bw_slope:0.5% is applied to every window of ss_dur seconds after the ramp
+# time, like fio does while the job is running:
+#
+# iops:N / bw:N           all samples are within N of the mean of the window
+# iops_slope:N / bw_slope:N  the slope of the least squares line through the
+#                         window is at most N per second
+#
+# With a % sign, the limit is a percentage of the mean of the window. Steady
+# state is reached at the end of the first window that meets the criterion.
+# The rolling statistics are computed for all windows at once with cumulative
+# sums and running minima and maxima.
+#
+METRICS = ["iops", "bw"]
+
+
+def parse_criterion(criterion):
+    """Returns the metric, whether the slope is used, the limit and whether
+    the limit is a percentage, or None if the criterion is invalid."""
+    try:
+        name, limit = criterion.split(":")
+        percentage = limit.endswith("%")
+        limit = float(limit.rstrip("%"))
+    except ValueError:
+        return None
+    metric = name[:-len("_slope")] if name.endswith("_slope") else name
+    if metric not in METRICS or limit < 0:
+        return None
+    return {
+        "metric": metric,
+        "slope": name.endswith("_slope"),
+        "limit": limit,
+        "percentage": percentage,
+    }
+
+
+def running_extreme(values, window, function):
+    """Returns function (np.maximum or np.minimum) over every window of
+    window samples (van Herk/Gil-Werman): the values are split in blocks of
+    window samples, so each window is the suffix of one block and the prefix
+    of the next one."""
+    size = len(values)
+    blocks = -(-size // window)
+    padded = np.resize(values, blocks * window).reshape(blocks, window)
+    prefix = function.accumulate(padded, axis=1).ravel()
+    suffix = function.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return function(suffix[:size - window + 1], prefix[window - 1:size])
+
+
+def get_window_statistics(values, window, interval):
+    """Returns the mean, the slope (per second) and the largest deviation
+    from the mean of every window of window samples. The values are centered
+    first to keep the cumulative sums small."""
+    center = values.mean()
+    centered = values - center
+    index = np.arange(len(values))
+    total = np.concatenate(([0.0], np.cumsum(centered)))
+    weighted = np.concatenate(([0.0], np.cumsum(index * centered)))
+    sums = total[window:] - total[:-window]
+    starts = index[:len(sums)]
+    products = weighted[window:] - weighted[:-window] - starts * sums
+    sum_x = window * (window - 1) / 2.0
+    sum_xx = (window - 1) * window * (2 * window - 1) / 6.0
+    slope = (window * products - sum_x * sums) / (window * sum_xx - sum_x ** 2)
+    mean = sums / window + center
+    maximum = running_extreme(values, window, np.maximum)
+    minimum = running_extreme(values, window, np.minimum)
+    deviation = np.maximum(maximum - mean, mean - minimum)
+    return mean, slope * 1000.0 / interval, deviation
+
+
+def get_criterion_values(criterion, mean, slope, deviation):
+    """Returns the value of every window that is compared with the limit."""
+    measured = np.abs(slope) if criterion["slope"] else deviation
+    if criterion["percentage"]:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            measured = np.where(mean != 0, measured * 100.0 / np.abs(mean), np.inf)
+    return measured
+
+
+def detect_series(settings, criterion, series):
+    """Applies the criterion to every window of a series (LogData) after the
+    ramp time. Returns whether and when (msec) steady state was reached, the
+    mean and criterion value of that first window and the regions (index
+    ranges) covered by all windows that meet the criterion."""
+    result = {"attained": False, "regions": []}
+    interval = anomaly.get_sample_interval(series.timestamp) or 1000
+    window = max(int(round(settings["ss_dur"] * 1000 / interval)), 2)
+    offset = int(np.searchsorted(series.timestamp, settings["ss_ramp"] * 1000))
+    values = series.value[offset:].astype(np.float64)
+    if len(values) < window:
+        return result
+    mean, slope, deviation = get_window_statistics(values, window, interval)
+    measured = get_criterion_values(criterion, mean, slope, deviation)
+    starts = np.flatnonzero(measured <= criterion["limit"])
+    if len(starts) == 0:
+        return result
+    first = starts[0]
+    covered = anomaly.get_mask(len(values), starts, starts + window - 1)
+    for start, end in zip(*anomaly.get_runs(covered)):
+        result["regions"].append(
+            {
+                "first_index": int(start + offset),
+                "last_index": int(end + offset),
+                "start": int(series.timestamp[start + offset]),
+                "end": int(series.timestamp[end + offset]),
+            }
+        )
+    result.update(
+        {
+            "attained": True,
+            "reached_index": int(first + window - 1 + offset),
+            "reached": int(series.timestamp[first + window - 1 + offset]),
+            "mean": float(mean[first]),
+            "criterion": float(measured[first]),
+        }
+    )
+    return result
+
+
+def print_result(settings, record, rw, result):
+    """Prints when steady state was reached for one series."""
+    name = f"{record['directory']} {rw} {record['type']} qd {record['iodepth']} nj {record['numjobs']}"
+    if result["attained"]:
+        print(
+            f"Steady state ({settings['steadystate']}) reached for {name} "
+            f"at {result['reached'] / 1000:g} s (mean {result['mean']:.2f}, "
+            f"criterion {result['criterion']:.4g})"
+        )
+    else:
+        print(f"Steady state ({settings['steadystate']}) not reached for {name}")
+
+
+def detect_steady_state(settings, dataset):
+    """Adds the steady state result per data direction to every record of
+    the merged dataset with the data type of the criterion."""
+    criterion = parse_criterion(settings["steadystate"])
+    if criterion is None:
+        print(f"\nInvalid steady state criterion {settings['steadystate']} (see --steadystate).\n")
+        sys.exit(1)
+    for record in dataset:
+        if record["type"] != criterion["metric"]:
+            continue
+        record["steadystate"] = {}
+        for rw in settings["filter"]:
+            series = record["data"][rw]
+            if len(series) > 0:
+                result = detect_series(settings, criterion, series)
+                record["steadystate"][rw] = result
+                print_result(settings, record, rw, result)
+    return dataset
@@ -7,40 +7,29 @@ from PIL.PngImagePlugin import PngImageFile, PngInfo
 import random
 import string
 
-
-def running_mean(l, N):
-    """From a list of values (N), calculate the running mean with a
-    window of (l) items. How larger the value l is, the more smooth the graph.
-    """
-    sum = 0
-    result = list(0 for x in l)
-
-    for i in range(0, N):
-        sum = sum + l[i]
-        result[i] = sum / (i + 1)
-
-    for i in range(N, len(l)):
-        sum = sum - l[i - N] + l[i]
-        result[i] = sum / N
-
-    return result
+def get_mean(dataset):
+    """Returns the mean of either a list or a numpy array of values."""
+    if isinstance(dataset, np.ndarray):
+        return dataset.mean()
+    return statistics.mean(dataset)
 
 
 def scale_xaxis_time(dataset):
     """FIO records log data time stamps in microseconds. To prevent huge numbers
     on the x-axis, the values are scaled to seconds, minutes or hours basedon the
     mean value of all data."""
+    dataset = np.asarray(dataset)
     result = {"format": "Time (ms)", "data": dataset}
-    mean = statistics.mean(dataset)
+    mean = dataset.mean()
 
     if (mean > 1000) & (mean < 1000000):
-        result["data"] = [x / 1000 for x in dataset]
+        result["data"] = dataset / 1000
         result["format"] = "Time (s)"
     if mean > 1000000:
-        result["data"] = [x / 60000 for x in dataset]
+        result["data"] = dataset / 60000
         result["format"] = "Time (m)"
     if mean > 36000000:  # only switch to hours with enough datapoints (+10)
-        result["data"] = [x / 3600000 for x in dataset]
+        result["data"] = dataset / 3600000
         result["format"] = "Time (h)"
     return result
 
@@ -51,7 +40,7 @@ def get_scale_factor_lat(dataset):
     the scale factor and the y-axis label is returned in a dictionary.
     """
     try:
-        mean = statistics.mean(dataset)
+        mean = get_mean(dataset)
     except statistics.StatisticsError as e:
         print(f"\n Long story short, something went wrong: {e}\n")
         sys.exit(1)
@@ -85,13 +74,16 @@ def scale_yaxis(dataset, scale):
     """The dataset supplied is scaled with the supplied scale. The scaled
     dataset is returned."""
     result = {}
-    result["data"] = [x / scale["scale"] for x in dataset]
+    if isinstance(dataset, np.ndarray):
+        result["data"] = dataset / scale["scale"]
+    else:
+        result["data"] = [x / scale["scale"] for x in dataset]
     result["format"] = scale["label"]
     return result
 
 
 def get_scale_factor_iops(dataset):
-    mean = statistics.mean(dataset)
+    mean = get_mean(dataset)
     scale_factors = [
         {"scale": 1000000, "label": "M IOPs"},
         {"scale": 1000, "label": "K IOPs"},
@@ -104,7 +96,7 @@ def get_scale_factor_iops(dataset):
 
 
 def get_scale_factor_bw(dataset):
-    mean = statistics.mean(dataset)
+    mean = get_mean(dataset)
     scale_factors = [
         {"scale": 1048576, "label": "GB/s"},
         {"scale": 1024, "label": "MB/s"},
@@ -207,6 +199,28 @@ def raw_stddev_to_percent(values, stddev_series):
     return result
 
 
+def get_statistics(settings, item, rw, scale):
+    """Returns the maximum, mean, standard deviation and percentile of a
+    series, divided by scale. They are computed exactly from the values of the
+    series, or taken from the quantile sketch that was built while importing
+    the data if the percentile_accuracy setting is used (see sketch.py)."""
+    summary = item.get("sketch", {}).get(rw)
+    if summary is None:
+        values = item[rw]["yvalues"]
+        return (
+            np.max(values),
+            np.mean(values),
+            np.std(values),
+            np.percentile(values, settings["percentile"]),
+        )
+    return (
+        summary.maximum / scale,
+        summary.mean / scale,
+        summary.stdev() / scale,
+        summary.percentile(settings["percentile"]) / scale,
+    )
+
+
 def process_dataset(settings, dataset):
 
     datatypes = []
@@ -216,19 +230,20 @@ def process_dataset(settings, dataset):
     scale_factors = []
 
     """
-    This first loop is to unpack the data in series and add scale the xaxis
+    This first loop is to unpack the data (LogData) in series and add scale the xaxis
     """
     for item in dataset:
         for rw in settings["filter"]:
             if len(item["data"][rw]) > 0:
                 datatypes.append(item["type"])
                 #pprint.pprint(item['data'][rw])
-                unpacked = list(zip(*item["data"][rw]))
-                
+                series = item["data"][rw]
+
                 item[rw] = {}
 
-                item[rw]["xvalues"] = unpacked[0]
-                item[rw]["yvalues"] = unpacked[1]
+                item[rw]["xvalues"] = series.timestamp
+                item[rw]["timestamps"] = series.timestamp
+                item[rw]["yvalues"] = series.value
 
                 scaled_xaxis = scale_xaxis_time(item[rw]["xvalues"])
                 item["xlabel"] = scaled_xaxis["format"]
@@ -250,19 +265,18 @@ def process_dataset(settings, dataset):
     for item in new_list:
         for rw in settings["filter"]:
             if rw in item.keys():
+                scale = 1
                 if "lat" in item["type"] or "bw" in item["type"]:
                     scaled_data = scale_yaxis(item[rw]["yvalues"], scale_factor)
                     item[rw]["ylabel"] = scaled_data["format"]
                     item[rw]["yvalues"] = scaled_data["data"]
+                    scale = scale_factor["scale"]
                 else:
                     item[rw]["ylabel"] = lookupTable(item["type"])["ylabel"]
 
-                max = np.max(item[rw]["yvalues"])
-                mean = np.mean(item[rw]["yvalues"])
-                stdv = round((np.std(item[rw]["yvalues"]) / mean) * 100, 2)
-                percentile = round(
-                    np.percentile(item[rw]["yvalues"], settings["percentile"]), 2
-                )
+                max, mean, stdv, percentile = get_statistics(settings, item, rw, scale)
+                stdv = round((stdv / mean) * 100, 2)
+                percentile = round(percentile, 2)
 
                 if mean > 1:
                     mean = round(mean, 2)
@@ -292,8 +306,8 @@ def process_dataset(settings, dataset):
 
 def get_highest_maximum(settings, data):
     highest_max = {
-        "read": {"iops": 0, "lat": 0, "bw": 0},
-        "write": {"iops": 0, "lat": 0, "bw": 0},
+        "read": {"iops": 0, "lat": 0, "bw": 0, "clat": 0, "slat": 0},
+        "write": {"iops": 0, "lat": 0, "bw": 0, "clat": 0, "slat": 0},
     }
     for item in data["dataset"]:
         for rw in settings["filter"]:
@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+
+from fio_plot.fiolib import anomaly, dataimport, defaultsettings
+from fio_plot.fiolib.logrecord import LogData
+
+
+class TestAnomaly(unittest.TestCase):
+    def setUp(self):
+        self.settings = defaultsettings.get_default_settings()
+        self.timestamps = np.arange(1, 301) * 1000
+        self.values = np.random.default_rng(1).normal(2000, 50, 300)
+        self.values[99:104] = 0
+        self.values[199] = 9000
+
+    def test_get_runs(self):
+        mask = np.array([True, True, False, True, False, False, True])
+        starts, ends = anomaly.get_runs(mask)
+        self.assertEqual(starts.tolist(), [0, 3, 6])
+        self.assertEqual(ends.tolist(), [1, 3, 6])
+
+    def test_stall_and_outlier(self):
+        series = LogData(self.timestamps, self.values)
+        result = anomaly.detect_series(self.settings, "iops", series)
+        intervals = [(x["kind"], x["start"], x["end"]) for x in result["intervals"]]
+        self.assertEqual(intervals, [("stall", 100000, 104000), ("high", 200000, 200000)])
+
+    def test_short_zero_streak_is_outlier(self):
+        self.settings["stall_duration"] = 10
+        series = LogData(self.timestamps, self.values)
+        result = anomaly.detect_series(self.settings, "iops", series)
+        kinds = [x["kind"] for x in result["intervals"]]
+        self.assertEqual(kinds, ["low", "high"])
+
+    def test_latency_has_no_stalls(self):
+        series = LogData(self.timestamps, self.values)
+        result = anomaly.detect_series(self.settings, "lat", series)
+        self.assertNotIn("stall", [x["kind"] for x in result["intervals"]])
+
+    def test_gap_is_stall(self):
+        selection = np.r_[0:99, 104:300]
+        series = LogData(self.timestamps[selection], np.full(295, 2000.0))
+        for datatype in ["iops", "lat"]:
+            result = anomaly.detect_series(self.settings, datatype, series)
+            intervals = [(x["kind"], x["start"], x["end"], x["samples"]) for x in result["intervals"]]
+            self.assertEqual(intervals, [("stall", 100000, 104000, 0)])
+
+    def test_job_stalls_before_merging(self):
+        self.settings["filter"] = ["read"]
+        timestamps = np.arange(1, 21) * 500
+        jobs = [
+            LogData(timestamps, np.full(20, 10)),
+            LogData(timestamps[np.r_[0:8, 12:20]], np.full(16, 10)),
+        ]
+        rawdata = []
+        for job, data in enumerate(jobs, 1):
+            rawdata.append(
+                {
+                    "data": data,
+                    "directory": "run",
+                    "iodepth": 1,
+                    "numjobs": 2,
+                    "type": "iops",
+                    "job": job,
+                    "filename": f"job{job}.log",
+                }
+            )
+        merged = dataimport.mergeSingleDataSet(rawdata, "iops")
+        dataset = [{"data": merged, "directory": "run", "iodepth": 1, "numjobs": 2, "type": "iops"}]
+        anomaly.detect_anomalies(self.settings, dataset, rawdata)
+        report = anomaly.get_report(self.settings, dataset)["series"][0]
+        self.assertEqual(report["stalls"], 0)
+        self.assertEqual(report["job_stalls"], 1)
+        self.assertEqual(report["jobs"][0]["job"], 2)
+        self.assertEqual(report["jobs"][0]["intervals"][0]["start"], 4500)
+        self.assertEqual(report["jobs"][0]["intervals"][0]["end"], 6000)
+
+    def test_constant_series(self):
+        series = LogData(self.timestamps, np.full(300, 10.0))
+        result = anomaly.detect_series(self.settings, "lat", series)
+        self.assertEqual(result["intervals"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
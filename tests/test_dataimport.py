@@ -0,0 +1,300 @@
+import os
+import gzip
+import lzma
+import zlib
+import tempfile
+import unittest
+import numpy as np
+
+from fio_plot.fiolib import aggregation, dataimport, defaultsettings, filescan, logcache, logparser
+from fio_plot.fiolib.logrecord import LogData
+
+
+class TestLogParser(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.settings = defaultsettings.get_default_settings()
+        self.settings["cache_dir"] = os.path.join(self.tempdir.name, "cache")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def write_binary(self, name, content):
+        path = os.path.join(self.tempdir.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def write_log(self, name, content):
+        path = os.path.join(self.tempdir.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_parse_log_buffer(self):
+        result = logparser.parse_log_buffer(b"1000, 10, 0, 4096, 0\n2000,  20, 1, 4096, 8192\n")
+        self.assertEqual(result.shape, (2, 5))
+        self.assertEqual(result[1].tolist(), [2000, 20, 1, 4096, 8192])
+
+    def test_parse_log_buffer_without_offset(self):
+        result = logparser.parse_log_buffer(b"1000, 10, 0, 4096\n2000, 20, 1, 4096")
+        self.assertEqual(result[:, logparser.OFFSET].tolist(), [0, 0])
+
+    def test_parse_log_buffer_malformed(self):
+        self.assertIsNone(logparser.parse_log_buffer(b"1000, 10, 0, 4096, 0\n\n2000, 20, 1, 4096, 0"))
+        self.assertIsNone(logparser.parse_log_buffer(b"1000, 10.5, 0, 4096, 0"))
+        self.assertIsNone(
+            logparser.parse_log_buffer(b"1000,10,0,4096,0\n2000,20,0,4096,0,9\n3000,30,0,4096")
+        )
+
+    def test_iter_buffer_chunks(self):
+        buffer = b"".join(b"%d, %d, 0, 4096, 0\n" % (x * 1000, x) for x in range(100))
+        chunks = list(logparser.iter_buffer_chunks(buffer, chunk_size=64))
+        self.assertTrue(all(chunk.endswith(b"\n") for chunk in chunks))
+        self.assertEqual(b"".join(chunks), buffer)
+        self.assertEqual(logparser.count_lines(buffer, chunk_size=64), 100)
+        self.assertEqual(logparser.count_lines(buffer.rstrip(), chunk_size=64), 100)
+
+    def test_parse_log_filename(self):
+        result = dataimport.parse_log_filename("/data/randread-iodepth-16-numjobs-8_clat.12.log.gz")
+        self.assertEqual(
+            result, {"rw": "randread", "iodepth": 16, "numjobs": 8, "type": "clat", "job": 12}
+        )
+        self.assertEqual(dataimport.parse_log_filename("read-iodepth-1-numjobs-1_bw.log")["job"], 1)
+        self.assertIsNone(dataimport.parse_log_filename("read-iodepth-1_bw.1.log"))
+
+    def test_filter_log_files_keeps_directory_order(self):
+        self.settings.update({"rw": "randread", "iodepth": [1], "numjobs": [2], "type": ["iops"]})
+        self.settings.update({"xlabel_segment_size": 1000, "xlabel_parent": 1, "xlabel_depth": 0})
+        file_list = []
+        for directory in ["zz_first", "aa_second"]:
+            os.mkdir(os.path.join(self.tempdir.name, directory))
+            for job in [2, 1]:
+                name = os.path.join(directory, f"randread-iodepth-1-numjobs-2_iops.{job}.log")
+                file_list.append(self.write_log(name, "1000, 10, 0, 4096, 0\n"))
+        result = dataimport.filterLogFiles(self.settings, file_list)
+        names = [os.path.relpath(x["filename"], self.tempdir.name) for x in result]
+        self.assertEqual(
+            names,
+            [
+                "zz_first/randread-iodepth-1-numjobs-2_iops.1.log",
+                "zz_first/randread-iodepth-1-numjobs-2_iops.2.log",
+                "aa_second/randread-iodepth-1-numjobs-2_iops.1.log",
+                "aa_second/randread-iodepth-1-numjobs-2_iops.2.log",
+            ],
+        )
+
+    def test_read_log_data_falls_back_to_csv(self):
+        path = self.write_log(
+            "read-iodepth-1-numjobs-1_iops.1.log",
+            "1000, 10, 0, 4096, 0\n\n2000, 20, 0, 4096, 0\n3000, 30, 0, 4096, 0\n",
+        )
+        result = dataimport.readLogData(self.settings, path)
+        self.assertEqual(result.value.tolist(), [10, 20, 30])
+
+    def test_read_compressed_log_data(self):
+        content = b"".join(b"%d, %d, 0, 4096, 0\n" % (x * 1000, x) for x in range(1, 101))
+        paths = [
+            self.write_binary("read-iodepth-1-numjobs-1_iops.1.log.gz", gzip.compress(content)),
+            self.write_binary("read-iodepth-1-numjobs-1_iops.2.log.xz", lzma.compress(content)),
+            self.write_binary(
+                "read-iodepth-1-numjobs-1_iops.3.log.fz",
+                zlib.compress(content[:1000]) + zlib.compress(content[1000:]),
+            ),
+        ]
+        for path in paths:
+            result = dataimport.readLogData(self.settings, path)
+            self.assertEqual(result.value.tolist(), list(range(1, 101)))
+        self.assertEqual(len(dataimport.list_fio_log_files(self.tempdir.name)), 3)
+
+    def test_scan_directory_recursive(self):
+        os.makedirs(os.path.join(self.tempdir.name, "ssd", "4k"))
+        self.write_log(os.path.join("ssd", "4k", "read-iodepth-1-numjobs-1_bw.1.log"), "")
+        self.write_log(os.path.join("ssd", "4k", "read-iodepth-1-numjobs-1.json"), "")
+        self.write_log("notes.txt", "")
+        flat = filescan.scan_directory(self.tempdir.name)
+        self.assertEqual((len(flat["log"]), len(flat["json"]), len(flat["other"])), (0, 0, 1))
+        tree = filescan.scan_directory(self.tempdir.name, recursive=True)
+        self.assertEqual((len(tree["log"]), len(tree["json"]), len(tree["other"])), (1, 1, 1))
+        self.assertIn(tree["log"][0], filescan.stat_cache)
+
+    def test_parse_raw_cvs_data(self):
+        dataset = LogData([2500, 5000, 7500], [10, 20, 30])
+        result = dataimport.parse_raw_cvs_data(self.settings, dataset)
+        self.assertEqual(result.timestamp.tolist(), [1000, 2000, 3000, 4000, 5000, 6000, 7000])
+        self.assertEqual(result.value.tolist(), [10, 10, 20, 20, 20, 30, 30])
+
+    def test_read_log_data_filters_directions(self):
+        path = self.write_log(
+            "randrw-iodepth-1-numjobs-1_iops.1.log",
+            "1000, 10, 0, 4096, 0\n1000, 11, 1, 4096, 0\n2000, 20, 0, 4096, 0\n2000, 21, 1, 4096, 0\n",
+        )
+        self.settings["filter"] = ["write"]
+        for no_cache in [True, False, False]:
+            self.settings["no_cache"] = no_cache
+            result = dataimport.readLogData(self.settings, path)
+            self.assertEqual(result.value.tolist(), [11, 21])
+
+    def test_read_log_data_from_files_workers(self):
+        inputfiles = []
+        for job in range(1, 5):
+            content = "".join(f"{x * 1000}, {x * job}, 0, 4096, 0\n" for x in range(1, 21))
+            path = self.write_log(f"read-iodepth-1-numjobs-4_iops.{job}.log", content)
+            inputfiles.append({"filename": path, "job": job})
+        self.settings["no_cache"] = True
+        self.settings["workers"] = 1
+        expected = dataimport.readLogDataFromFiles(self.settings, inputfiles)
+        self.settings["workers"] = 2
+        result = dataimport.readLogDataFromFiles(self.settings, inputfiles)
+        self.assertEqual([x["job"] for x in result], [1, 2, 3, 4])
+        for job, (single, parallel) in enumerate(zip(expected, result), 1):
+            self.assertEqual(parallel["data"].value.tolist(), [x * job for x in range(1, 21)])
+            self.assertEqual(parallel["data"].timestamp.tolist(), single["data"].timestamp.tolist())
+            self.assertEqual(parallel["data"].value.tolist(), single["data"].value.tolist())
+
+    def test_find_window_offsets(self):
+        buffer = b"".join(b"%d, 10, 0, 4096, 0\n" % (x * 1000) for x in range(1, 101))
+        first, last = logparser.find_window_offsets(buffer, (10000, 20000))
+        result = logparser.parse_log_buffer(buffer[first:last])
+        self.assertEqual(result[0, logparser.TIMESTAMP], 10000)
+        self.assertEqual(result[-1, logparser.TIMESTAMP], 20000)
+        self.assertEqual(logparser.find_window_offsets(buffer, (None, 500)), (0, 0))
+
+    def test_read_log_data_time_window(self):
+        content = "".join(f"{x * 1000}, {x}, 0, 4096, 0\n" for x in range(1, 11))
+        path = self.write_log("read-iodepth-1-numjobs-1_iops.1.log", content)
+        gzpath = self.write_binary("read-iodepth-1-numjobs-2_iops.1.log.gz", gzip.compress(content.encode()))
+        self.settings["time_start"] = 4
+        self.settings["time_end"] = 6
+        for inputfile, no_cache in [(path, True), (path, False), (gzpath, True)]:
+            self.settings["no_cache"] = no_cache
+            result = dataimport.readLogData(self.settings, inputfile)
+            self.assertEqual(result.timestamp.tolist(), [4000, 5000, 6000])
+            self.assertEqual(result.value.tolist(), [4, 5, 6])
+
+    def test_read_log_data_short_time_window(self):
+        content = "".join(f"{x * 1000}, {x}, 0, 4096, 0\n" for x in range(1, 11))
+        path = self.write_log("read-iodepth-1-numjobs-1_iops.1.log", content)
+        for start, end, expected in [(5, 5.5, [5]), (5.2, 5.8, []), (20, 30, [])]:
+            self.settings["time_start"] = start
+            self.settings["time_end"] = end
+            result = dataimport.readLogData(self.settings, path)
+            self.assertEqual(result.value.tolist(), expected)
+
+    def test_read_log_data_trim(self):
+        content = "".join(f"{x * 1000}, {x}, 0, 4096, 0\n{x * 1000}, {x + 100}, 1, 4096, 0\n" for x in range(1, 11))
+        path = self.write_log("randrw-iodepth-1-numjobs-1_iops.1.log", content)
+        gzpath = self.write_binary("randrw-iodepth-1-numjobs-2_iops.1.log.gz", gzip.compress(content.encode()))
+        self.settings["trim_start"] = 2
+        self.settings["trim_end"] = 3
+        for inputfile in [path, gzpath]:
+            result = dataimport.readLogData(self.settings, inputfile)
+            self.assertEqual(result.direction("read").value.tolist(), [3, 4, 5, 6, 7])
+        self.settings["trim_unit"] = "samples"
+        self.settings["trim_start"] = 1
+        self.settings["trim_end"] = 2
+        result = dataimport.readLogData(self.settings, path)
+        self.assertEqual(result.direction("write").value.tolist(), [102, 103, 104, 105, 106, 107, 108])
+
+    def test_read_histogram_log_trim(self):
+        counts = ", ".join(["0"] * 1855 + ["1"])
+        content = "".join(f"{x * 1000}, 0, 4096, {counts}\n" for x in range(1, 301))
+        path = self.write_log("randread-iodepth-1-numjobs-1_clat_hist.1.log", content)
+        self.settings["trim_start"] = 100
+        self.settings["trim_end"] = 100
+        result = dataimport.readLogData(self.settings, path)
+        self.assertEqual(result.timestamp[[0, -1]].tolist(), [101000, 200000])
+        self.settings["trim_unit"] = "samples"
+        self.settings["time_end"] = 150
+        result = dataimport.readLogData(self.settings, path)
+        self.assertEqual(result.timestamp[[0, -1]].tolist(), [101000, 150000])
+
+    def test_read_log_data_aggregated_trim(self):
+        content = "".join(f"{x * 500}, {x}, 0, 4096, 0\n{x * 500}, {x + 100}, 1, 4096, 0\n" for x in range(1, 21))
+        path = self.write_log("randrw-iodepth-1-numjobs-1_iops.1.log", content)
+        gzpath = self.write_binary("randrw-iodepth-1-numjobs-2_iops.1.log.gz", gzip.compress(content.encode()))
+        for unit, start, end in [("seconds", 2, 3), ("samples", 3, 1)]:
+            self.settings["trim_unit"] = unit
+            self.settings["trim_start"] = start
+            self.settings["trim_end"] = end
+            self.settings["aggregate"] = None
+            trimmed = dataimport.readLogData(self.settings, path)
+            state = aggregation.new_aggregate_state(1000)
+            expected = aggregation.get_aggregate(aggregation.fold_logdata(state, trimmed), "max")
+            self.settings["aggregate"] = 1000
+            self.settings["aggregate_function"] = "max"
+            for inputfile in [path, gzpath]:
+                result = dataimport.readLogData(self.settings, inputfile)
+                self.assertEqual(result.value.tolist(), expected.value.tolist())
+                self.assertEqual(result.rwt.tolist(), expected.rwt.tolist())
+
+    def test_log_cache(self):
+        path = self.write_log("read-iodepth-1-numjobs-1_iops.1.log", "1000, 10, 0, 4096, 0\n2000, 20, 0, 4096, 0\n")
+        self.assertIsNone(logcache.load(self.settings, path))
+        dataimport.readLogData(self.settings, path)
+        self.assertEqual(logcache.load(self.settings, path).value.tolist(), [10, 20])
+        self.write_log("read-iodepth-1-numjobs-1_iops.1.log", "1000, 10, 0, 4096, 0\n2000, 30, 0, 4096, 0\n3000, 5, 0, 4096, 0\n")
+        self.assertIsNone(logcache.load(self.settings, path))
+
+    def test_log_cache_blank_size(self):
+        path = self.write_log("read-iodepth-1-numjobs-1_iops.1.log", "1000, 10, 0, 4096, 0\n2000, 20, 0, 4096, 0\n")
+        self.settings["cache_size"] = None
+        dataimport.readLogData(self.settings, path)
+        self.assertEqual(logcache.load(self.settings, path).value.tolist(), [10, 20])
+
+    def test_log_cache_skips_large_entries(self):
+        path = self.write_log("read-iodepth-1-numjobs-1_iops.1.log", "1000, 10, 0, 4096, 0\n2000, 20, 0, 4096, 0\n")
+        self.settings["cache_size"] = 0
+        result = dataimport.readLogData(self.settings, path)
+        self.assertEqual(result.value.tolist(), [10, 20])
+        self.assertFalse(os.path.exists(self.settings["cache_dir"]) and os.listdir(self.settings["cache_dir"]))
+
+    def test_aggregate_chunks(self):
+        chunks = [
+            logparser.parse_log_buffer(b"100, 10, 0, 4096, 0\n200, 30, 0, 4096, 0\n200, 7, 1, 4096, 0"),
+            logparser.parse_log_buffer(b"1100, 50, 0, 4096, 0\n"),
+        ]
+        result = aggregation.aggregate_chunks(chunks, 1000, "mean")
+        read = result.direction("read")
+        self.assertEqual(read.timestamp.tolist(), [1000, 2000])
+        self.assertEqual(read.value.tolist(), [20, 50])
+        self.assertEqual(result.direction("write").value.tolist(), [7])
+
+    def test_merge_single_dataset(self):
+        jobs = []
+        for job in range(2):
+            data = logparser.parse_log_buffer(
+                b"1000, 10, 0, 4096, 0\n1000, 5, 1, 4096, 0\n2000, 30, 0, 4096, 0\n2000, 7, 1, 4096, 0"
+            )
+            jobs.append({"data": LogData.from_array(data)})
+        merged = dataimport.mergeSingleDataSet(jobs, "iops")
+        self.assertEqual(merged["read"].value.tolist(), [20, 60])
+        self.assertEqual(merged["write"].value.tolist(), [10, 14])
+
+    def test_merge_single_dataset_aligns_timestamps(self):
+        first = LogData([1000, 2000, 3000, 4000], [10, 10, 10, 10])
+        second = LogData([1004, 1998, 4002], [5, 5, 7])
+        merged = dataimport.mergeSingleDataSet([{"data": first}, {"data": second}], "iops")
+        self.assertEqual(merged["read"].timestamp.tolist(), [1000, 2000, 3000, 4000])
+        self.assertEqual(merged["read"].value.tolist(), [15, 15, 10, 17])
+        merged = dataimport.mergeSingleDataSet([{"data": first}, {"data": LogData([3001], [20])}], "lat")
+        self.assertEqual(merged["read"].value.tolist(), [10, 10, 15, 10])
+
+    def test_merge_single_dataset_with_gap(self):
+        first = LogData(np.arange(1, 11) * 1000, np.full(10, 10))
+        second = first.select(np.r_[0:3, 5:10])
+        merged = dataimport.mergeSingleDataSet([{"data": first}, {"data": second}], "iops")
+        self.assertEqual(merged["read"].value.tolist(), [20] * 3 + [10] * 2 + [20] * 5)
+        second.value = np.arange(8) * 10
+        merged = dataimport.mergeSingleDataSet([{"data": first}, {"data": second}], "lat")
+        self.assertEqual(merged["read"].value.tolist(), [5, 10, 15, 10, 10, 20, 25, 30, 35, 40])
+
+    def test_merge_single_job_unchanged(self):
+        job = LogData([1000, 1000, 1001, 1002], [10, 500, 20, 20])
+        merged = dataimport.mergeSingleDataSet([{"data": job}, {"data": LogData.empty()}], "lat")
+        self.assertEqual(merged["read"].timestamp.tolist(), [1000, 1000, 1001, 1002])
+        self.assertEqual(merged["read"].value.tolist(), [10, 500, 20, 20])
+
+
+if __name__ == "__main__":
+    unittest.main()
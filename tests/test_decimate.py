@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+
+from fio_plot.fiolib import decimate
+
+
+class TestDecimate(unittest.TestCase):
+    def test_lttb_keeps_peaks(self):
+        xvalues = np.arange(10000)
+        yvalues = np.sin(xvalues / 500.0)
+        yvalues[1234] = 50
+        yvalues[7777] = -50
+        x, y = decimate.lttb(xvalues, yvalues, 500)
+        self.assertEqual(len(x), 500)
+        self.assertEqual((x[0], x[-1]), (0, 9999))
+        self.assertTrue(np.all(np.diff(x) > 0))
+        self.assertIn(1234, x)
+        self.assertIn(7777, x)
+
+    def test_lttb_short_line(self):
+        x, y = decimate.lttb([1, 2, 3], [4, 5, 6], 500)
+        self.assertEqual(y.tolist(), [4, 5, 6])
+
+    def test_envelope(self):
+        xvalues = np.arange(1000)
+        yvalues = np.ones(1000)
+        yvalues[500] = 100
+        x, minimum, maximum, mean = decimate.envelope(xvalues, yvalues, 10)
+        self.assertEqual(len(x), 10)
+        self.assertEqual(x[0], 0)
+        self.assertEqual(maximum.max(), 100)
+        self.assertEqual(minimum.tolist(), [1] * 10)
+        self.assertAlmostEqual(mean.mean(), yvalues.mean())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+
+from fio_plot.fiolib import fairness
+from fio_plot.fiolib.logrecord import LogData
+
+
+class TestFairness(unittest.TestCase):
+    def test_jain_index(self):
+        matrix = np.array(
+            [
+                [10.0, 10.0, 0.0, np.nan],
+                [10.0, 0.0, 0.0, 5.0],
+                [10.0, 0.0, 0.0, 5.0],
+            ]
+        )
+        result = fairness.jain_index(matrix)
+        np.testing.assert_allclose(result, [1.0, 1 / 3, 1.0, 1.0])
+
+    def test_get_fairness(self):
+        timestamps = np.arange(1, 11) * 1000
+        fast = LogData(timestamps, np.full(10, 300))
+        slow = LogData(timestamps[2:] + 3, np.full(8, 100))
+        result = fairness.get_fairness([fast, slow], "sum")
+        self.assertEqual(result["jobs"].tolist(), [1, 1] + [2] * 8)
+        self.assertEqual(result["minimum"].tolist(), [300, 300] + [100] * 8)
+        self.assertEqual(result["maximum"].tolist(), [300] * 10)
+        np.testing.assert_allclose(result["jain"][2:], 400 ** 2 / (2 * (300 ** 2 + 100 ** 2)))
+
+    def test_get_fairness_starved_job(self):
+        timestamps = np.arange(1, 21) * 500
+        running = LogData(timestamps, np.full(20, 100))
+        starved = running.select(np.r_[0:8, 12:20])
+        result = fairness.get_fairness([running, starved], "sum")
+        self.assertEqual(result["jobs"].tolist(), [2] * 20)
+        self.assertEqual(result["minimum"].tolist(), [100] * 8 + [0] * 4 + [100] * 8)
+        np.testing.assert_allclose(result["jain"], [1.0] * 8 + [0.5] * 4 + [1.0] * 8)
+        result = fairness.get_fairness([running, starved], "mean")
+        self.assertEqual(result["jobs"].tolist(), [2] * 8 + [1] * 4 + [2] * 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
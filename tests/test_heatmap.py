@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+
+from fio_plot.fiolib import defaultsettings, heatmap, histlog
+
+
+class TestHeatmap(unittest.TestCase):
+    def setUp(self):
+        self.settings = defaultsettings.get_default_settings()
+        self.settings["heatmap_bins"] = [2, 2]
+        self.timestamps = np.array([0, 10, 90, 100])
+        self.offsets = np.array([0, 0, 4096, 4096])
+        self.values = np.array([10, 30, 100, 200])
+
+    def test_iops_counts(self):
+        self.settings["type"] = ["iops"]
+        result, xedges, yedges = heatmap.get_heatmap(self.settings, self.timestamps, self.offsets, self.values)
+        self.assertEqual(result.filled(0).tolist(), [[2, 0], [0, 2]])
+
+    def test_mean_latency(self):
+        self.settings["type"] = ["lat"]
+        result, xedges, yedges = heatmap.get_heatmap(self.settings, self.timestamps, self.offsets, self.values)
+        self.assertEqual(result[0, 0], 20)
+        self.assertEqual(result[1, 1], 150)
+        self.assertTrue(result.mask[0, 1])
+
+    def test_latency_density(self):
+        self.settings["heatmap_bins"] = [2, 3]
+        values = np.array([100, 1000, 10000, 10000])
+        counts, xedges, yedges = heatmap.get_density(self.settings, self.timestamps, values)
+        self.assertEqual(counts.sum(), 4)
+        self.assertEqual(counts.tolist(), [[1, 1, 0], [0, 0, 2]])
+        self.assertEqual((yedges[0], yedges[-1]), (2, 4))
+
+    def test_tail_heatmap(self):
+        self.settings["heatmap_bins"] = [2, 10]
+        counts = np.zeros((4, 1856), dtype=int)
+        counts[:, 200] = 99
+        counts[:, 900] = 1
+        counts[3, 900] = 101
+        series = histlog.HistData([1000, 2000, 3000, 4000], [0] * 4, [4096] * 4, counts, histlog.get_bin_values(1856))
+        shares, time_edges, latency_edges = heatmap.get_tail_heatmap(self.settings, [series])
+        self.assertEqual(shares.shape, (2, 10))
+        np.testing.assert_allclose(shares.sum(axis=1), [100, 100])
+        self.assertAlmostEqual(shares[0, -1], 1)
+        self.assertAlmostEqual(shares[1, -1], 34)
+
+    def test_tail_heatmap_without_io(self):
+        counts = np.zeros((3, 1856), dtype=int)
+        series = histlog.HistData([1000, 2000, 3000], [0] * 3, [4096] * 3, counts, histlog.get_bin_values(1856))
+        self.assertIsNone(heatmap.get_tail_heatmap(self.settings, [series]))
+
+
+if __name__ == "__main__":
+    unittest.main()
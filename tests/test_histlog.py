@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+
+from fio_plot.fiolib import histlog
+
+
+def hist_line(timestamp, direction, counts, priority=False):
+    head = [timestamp, direction, 4096] + ([0] if priority else [])
+    return ", ".join(str(x) for x in head + list(counts))
+
+
+class TestHistLog(unittest.TestCase):
+    def test_plat_idx_to_val(self):
+        self.assertEqual(histlog.plat_idx_to_val([0, 127, 128, 192]).tolist(), [0, 127, 129, 258])
+
+    def test_bin_values_with_coarseness(self):
+        self.assertEqual(len(histlog.get_bin_values(1856)), 1856)
+        coarse = histlog.get_bin_values(464)
+        self.assertEqual(coarse[0], 1.5)
+        self.assertTrue(np.all(np.diff(coarse) > 0))
+
+    def test_parse_and_merge(self):
+        fine = np.zeros(1856, dtype=int)
+        fine[100] = 90
+        fine[1000] = 10
+        coarse = fine.reshape(464, 4).sum(axis=1)
+        first = histlog.parse_hist_buffer(hist_line(1000, 0, fine).encode())
+        second = histlog.parse_hist_buffer(hist_line(1002, 0, coarse, priority=True).encode())
+        self.assertEqual(first.counts.shape, (1, 1856))
+        self.assertEqual(second.counts.shape, (1, 464))
+        timestamps, counts, bin_values = histlog.merge_histograms([first, second])
+        self.assertEqual(timestamps.tolist(), [1000])
+        self.assertEqual(counts.sum(), 200)
+        p50, p99 = histlog.get_percentiles(counts, bin_values, [50, 99])[0]
+        self.assertEqual(p50, bin_values[25])
+        self.assertEqual(p99, bin_values[250])
+
+    def test_parse_invalid_layout(self):
+        self.assertIsNone(histlog.parse_hist_buffer(b"1000, 0, 4096, 1, 2, 3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+
+from fio_plot.fiolib import dataimport, defaultsettings, sketch, supporting
+from fio_plot.fiolib.logrecord import LogData
+
+
+class TestSketch(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(2).lognormal(8, 1, 100000)
+
+    def test_statistics(self):
+        summary = sketch.QuantileSketch.from_values(self.values, 0.01)
+        self.assertEqual(summary.maximum, self.values.max())
+        self.assertAlmostEqual(summary.mean, self.values.mean())
+        self.assertAlmostEqual(summary.stdev(), self.values.std())
+        for percentile in [1, 50, 99, 99.99]:
+            expected = np.percentile(self.values, percentile)
+            self.assertLessEqual(abs(summary.percentile(percentile) - expected), expected * 0.011)
+
+    def test_merge(self):
+        first = sketch.QuantileSketch.from_values(self.values[:30000])
+        second = sketch.QuantileSketch.from_values(np.append(self.values[30000:], [0, 0]))
+        whole = sketch.QuantileSketch.from_values(np.append(self.values, [0, 0]))
+        first.merge(second)
+        self.assertEqual(first.count, whole.count)
+        self.assertEqual(first.zero_count, 2)
+        self.assertAlmostEqual(first.mean, whole.mean)
+        self.assertAlmostEqual(first.stdev(), whole.stdev())
+        self.assertEqual(first.percentile(90), whole.percentile(90))
+
+    def test_exact_statistics_by_default(self):
+        settings = defaultsettings.get_default_settings()
+        settings["percentile"] = 99.99
+        merged = {"read": LogData(np.arange(len(self.values)), self.values)}
+        item = {"sketch": dataimport.get_sketches(settings, merged), "read": {"yvalues": self.values}}
+        statistics = supporting.get_statistics(settings, item, "read", 1)
+        self.assertEqual(statistics[3], np.percentile(self.values, settings["percentile"]))
+        settings["percentile_accuracy"] = 0.01
+        item["sketch"] = dataimport.get_sketches(settings, merged)
+        self.assertIsInstance(item["sketch"]["read"], sketch.QuantileSketch)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+
+from fio_plot.fiolib import defaultsettings, smoothing
+
+
+class TestSmoothing(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(1).integers(0, 1000, 5000).astype(float)
+
+    def test_simple_moving_average(self):
+        window = 7
+        expected = [self.values[max(0, i - window + 1):i + 1].mean() for i in range(len(self.values))]
+        result = smoothing.simple_moving_average(self.values, window)
+        np.testing.assert_allclose(result, expected)
+
+    def test_exponential_moving_average(self):
+        window = 3
+        alpha = 2 / (window + 1)
+        expected = [self.values[0]]
+        for value in self.values[1:]:
+            expected.append(alpha * value + (1 - alpha) * expected[-1])
+        result = smoothing.exponential_moving_average(self.values, window)
+        np.testing.assert_allclose(result, expected)
+
+    def test_rolling_percentile(self):
+        window = 5
+        expected = [np.percentile(self.values[max(0, i - window + 1):i + 1], 90) for i in range(len(self.values))]
+        result = smoothing.rolling_percentile(self.values, window, 90)
+        np.testing.assert_allclose(result, expected)
+
+    def test_rolling_percentile_large_window(self):
+        window = smoothing.SORTED_WINDOW_SIZE + 44
+        expected = [np.percentile(self.values[max(0, i - window + 1):i + 1], 95) for i in range(len(self.values))]
+        result = smoothing.rolling_percentile(self.values, window, 95)
+        np.testing.assert_allclose(result, expected)
+        result = smoothing.rolling_percentile(self.values[:100], window)
+        np.testing.assert_allclose(result, [np.median(self.values[:i + 1]) for i in range(100)])
+
+    def test_window_in_seconds(self):
+        settings = defaultsettings.get_default_settings()
+        settings["smooth_window"] = 10
+        settings["smooth_unit"] = "seconds"
+        timestamps = np.arange(0, 100000, 500)
+        self.assertEqual(smoothing.get_window_size(settings, timestamps), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+
+from fio_plot.fiolib import defaultsettings, steadystate
+from fio_plot.fiolib.logrecord import LogData
+
+
+class TestSteadyState(unittest.TestCase):
+    def setUp(self):
+        self.settings = defaultsettings.get_default_settings()
+        self.settings["ss_dur"] = 10
+        rng = np.random.default_rng(3)
+        self.timestamps = np.arange(1, 201) * 1000
+        self.values = rng.normal(1000, 5, 200)
+        self.values[:50] += np.linspace(500, 0, 50)
+
+    def test_parse_criterion(self):
+        criterion = steadystate.parse_criterion("iops_slope:0.5%")
+        self.assertEqual(criterion, {"metric": "iops", "slope": True, "limit": 0.5, "percentage": True})
+        self.assertEqual(steadystate.parse_criterion("bw:100")["percentage"], False)
+        self.assertIsNone(steadystate.parse_criterion("lat:10%"))
+        self.assertIsNone(steadystate.parse_criterion("iops"))
+
+    def test_window_statistics(self):
+        window = 7
+        mean, slope, deviation = steadystate.get_window_statistics(self.values, window, 500)
+        self.assertEqual(len(mean), len(self.values) - window + 1)
+        for start in [0, 40, len(mean) - 1]:
+            x = self.values[start:start + window]
+            self.assertAlmostEqual(mean[start], x.mean())
+            self.assertAlmostEqual(slope[start], np.polyfit(np.arange(window), x, 1)[0] * 2)
+            self.assertAlmostEqual(deviation[start], np.abs(x - x.mean()).max())
+
+    def test_reached_after_ramp(self):
+        criterion = steadystate.parse_criterion("iops:3%")
+        result = steadystate.detect_series(self.settings, criterion, LogData(self.timestamps, self.values))
+        self.assertTrue(result["attained"])
+        self.assertGreater(result["reached"], 40000)
+        self.assertEqual(result["regions"][-1]["end"], 200000)
+
+    def test_not_reached(self):
+        criterion = steadystate.parse_criterion("iops:0.01%")
+        result = steadystate.detect_series(self.settings, criterion, LogData(self.timestamps, self.values))
+        self.assertFalse(result["attained"])
+        self.assertEqual(result["regions"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()